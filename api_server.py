@@ -0,0 +1,172 @@
+"""HTTP inference service for the disease models.
+
+Each model is served at ``POST /predict/<model>``. The body is either a single
+record or a JSON array of records keyed by the same feature names as the
+Streamlit inputs (see ``schemas.SCHEMAS``):
+
+    curl -X POST localhost:8000/predict/thyroid \\
+         -d '{"age": 41, "sex": 1, "on_thyroxine": 0, "tsh": 1.3, "t3_measured": 1, "t3": 2.5, "tt4": 125}'
+
+Models are loaded once per worker process at startup, so the service scales
+out with ``uvicorn api_server:app --workers 4``. Point the Streamlit app at it
+by setting ``INFERENCE_API_URL``. Single records are micro-batched per model
+(see ``batching.py``) and answered from the prediction cache when possible
+(see ``prediction_cache.py``); arrays are scored directly as one matrix.
+``POST /panel`` scores one patient against all five models (see ``panel.py``).
+Add ``?explain=true`` to either endpoint for per-feature ``contributions`` to
+each prediction (see ``explain.py``); they are ``null`` for a model that
+can't be explained.
+``GET /metrics/drift`` reports input drift against the training data (see
+``drift.py``); ``/metrics/registry``, ``/metrics/cache`` and
+``/metrics/batching`` report model loads, cache hits and batch sizes. With ``METRICS=1``, ``GET /metrics`` serves per-stage latency
+histograms in the Prometheus text format (see ``metrics.py``).
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Body, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+import config
+import metrics
+from batching import QueueFullError, batching_metrics, get_batcher
+from drift import monitor, observe
+from inference import predict_records, records_to_matrix, score_row, try_explain_matrix
+from model_registry import registry
+from panel import score_panel
+from prediction_cache import cache
+from schemas import SCHEMAS
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm every model in this worker before it accepts traffic
+    await run_in_threadpool(registry.preload)
+    yield
+
+
+app = FastAPI(title='Disease Prediction API', lifespan=lifespan)
+
+
+@app.get('/health')
+async def health():
+    return {'status': 'ok'}
+
+
+@app.get('/models')
+async def list_models():
+    return {
+        name: {'features': [{'name': f.name, 'label': f.label, 'dtype': f.dtype,
+                             'min': f.min_value, 'max': f.max_value} for f in schema]}
+        for name, schema in SCHEMAS.items()
+    }
+
+
+@app.get('/metrics', response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage latency histograms, errors and batch sizes in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.get('/metrics/batching')
+async def batching():
+    return batching_metrics()
+
+
+@app.get('/metrics/registry')
+async def registry_metrics():
+    """Model lookups (hits), loads and reloads per model, with cumulative load time"""
+    return registry.stats()
+
+
+@app.get('/metrics/cache')
+async def cache_metrics():
+    # With PREDICTION_CACHE_DB this scans the SQLite tier; keep it off the event loop
+    return await run_in_threadpool(cache.stats)
+
+
+@app.get('/metrics/drift')
+async def drift_metrics(evaluate: bool = False):
+    """Latest per-feature drift scores; ``?evaluate=true`` scores the current windows now"""
+    if evaluate:
+        return await run_in_threadpool(monitor.evaluate, True)
+    return monitor.report()
+
+
+@app.post('/predict/{name}')
+async def predict(name: str, payload: dict | list[dict] = Body(...), explain: bool = False):
+    if name not in SCHEMAS:
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}'")
+    records = payload if isinstance(payload, list) else [payload]
+    if not records:
+        raise HTTPException(status_code=422, detail='No records supplied')
+    with metrics.timed('request', name):
+        return await _predict(name, records, explain)
+
+
+def _lookup(name, records):
+    """``(row, result, future, cached)`` for a single record: a cached result, or a queued or computed one"""
+    row = records_to_matrix(name, records)[0]
+    observe(name, row)
+    result = cache.get(name, row) if config.PREDICTION_CACHE else None
+    if result is not None:
+        return row, result, None, True
+    if config.MICRO_BATCHING:
+        # Coalesced with other in-flight requests for this model
+        return row, None, get_batcher(name).submit(row), False
+    return row, score_row(name, row), None, False
+
+
+def _finish(name, row, result, store, explain):
+    if store:
+        cache.put(name, row, result)
+    return try_explain_matrix(name, row) if explain else None
+
+
+async def _predict(name, records, explain=False):
+    # Cache lookups (SQLite, model hashing) and scoring block; only awaits run on the event loop
+    try:
+        if len(records) == 1 and (config.PREDICTION_CACHE or config.MICRO_BATCHING):
+            row, result, future, cached = await run_in_threadpool(_lookup, name, records)
+            store = config.PREDICTION_CACHE and not cached
+            if future is not None:
+                result = await asyncio.wrap_future(future)
+            contributions = None
+            if store or explain:
+                contributions = await run_in_threadpool(_finish, name, row, result, store, explain)
+            label, value, kind = result
+            response = {
+                'model': name,
+                'labels': [label],
+                'probabilities': [value] if kind == 'probability' else None,
+                'scores': [value] if kind == 'score' else None,
+            }
+            if explain:
+                response['contributions'] = contributions
+            return response
+        # predict is CPU-bound; keep it off the event loop
+        return await run_in_threadpool(predict_records, name, records, explain)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@app.post('/panel')
+async def panel(record: dict = Body(...), explain: bool = False):
+    """Score one patient with every model whose inputs are present, in parallel"""
+    return await run_in_threadpool(score_panel, record, None, explain)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Serve the disease models over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+    uvicorn.run('api_server:app', host=args.host, port=args.port, workers=args.workers)
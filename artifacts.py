@@ -0,0 +1,184 @@
+"""Versioned, pickle-free model artifacts.
+
+Each model is stored as a directory next to its ``.sav`` file::
+
+    Models/<model>/manifest.json   feature order, model type, provenance
+    Models/<model>/<param>.npy     one float64 array per fitted parameter
+
+The manifest records the feature names in the order ``app.py`` passes them,
+the estimator type, the SHA-256 of the training dataset and source ``.sav``,
+the sklearn version the model was fitted with, and the training-set mean of
+each feature (the reference patient for ``explain.py``). Arrays are opened with
+``mmap_mode='r'``, so every worker process maps the same pages instead of
+holding its own copy, and loading never executes code or imports sklearn.
+
+    python artifacts.py convert          # write artifacts for all five .sav files
+    python artifacts.py verify           # check hashes and prediction parity
+"""
+import json
+import os
+
+import numpy as np
+
+from fast_models import CompiledModel
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+class ArtifactError(ValueError):
+    """Raised when an artifact is malformed, incompatible or fails verification"""
+
+
+def _array_sha256(array):
+    import hashlib
+    return hashlib.sha256(np.ascontiguousarray(array).tobytes()).hexdigest()
+
+
+def write_artifact(directory, meta, arrays, extra=None):
+    """Write ``(meta, arrays)`` from ``fast_models.export_params`` to ``directory``
+
+    Every file is written to a temporary name and renamed into place, never
+    rewritten: a worker that has the old arrays memory-mapped keeps reading
+    the old inodes until it reloads. The manifest is renamed last, so readers
+    never see a manifest that refers to missing or half-written arrays.
+    """
+    os.makedirs(directory, exist_ok=True)
+    entries = {}
+    for key, array in sorted(arrays.items()):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        filename = f'{key}.npy'
+        path = os.path.join(directory, filename)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(tmp, path)
+        entries[key] = {
+            'file': filename,
+            'dtype': str(array.dtype),
+            'shape': list(array.shape),
+            'sha256': _array_sha256(array),
+        }
+    manifest = dict(extra or {})
+    manifest.update(format_version=FORMAT_VERSION, params=meta, arrays=entries)
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, path)
+    return path
+
+
+def read_manifest(path):
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ArtifactError(f"{path}: unsupported format_version {manifest.get('format_version')!r}")
+    return manifest
+
+
+def load_artifact(path, mmap=True, verify=False):
+    """Load a ``CompiledModel`` from a manifest path or artifact directory"""
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST_NAME)
+    manifest = read_manifest(path)
+    directory = os.path.dirname(path)
+    arrays = {}
+    for key, entry in manifest['arrays'].items():
+        array = np.load(os.path.join(directory, entry['file']), mmap_mode='r' if mmap else None,
+                        allow_pickle=False)
+        if list(array.shape) != entry['shape'] or str(array.dtype) != entry['dtype']:
+            raise ArtifactError(f"{path}: array '{key}' does not match its manifest entry")
+        if verify and _array_sha256(array) != entry['sha256']:
+            raise ArtifactError(f"{path}: array '{key}' failed its checksum")
+        arrays[key] = array
+    model = CompiledModel(manifest['params'], arrays)
+    model.manifest = manifest
+    return model
+
+
+def convert(name, registry=None):
+    """Convert the ``.sav`` model ``name`` into an artifact; returns the manifest path"""
+    import pickle
+    import warnings
+
+    import sklearn
+
+    from batch_predict import DATASET_FILES, iter_chunks
+    from fast_models import export_params
+    from model_registry import BASE_DIR, ModelRegistry, file_sha256
+    from schemas import SCHEMAS
+
+    registry = registry or ModelRegistry()
+    sav_path = registry.sav_path(name)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        with open(sav_path, 'rb') as f:
+            estimator = pickle.load(f)
+    # sklearn drops the pickled version on load and reports it through the warning
+    sklearn_version = next((w.message.original_sklearn_version for w in caught
+                            if hasattr(w.message, 'original_sklearn_version')), sklearn.__version__)
+
+    meta, arrays = export_params(estimator)
+    dataset = DATASET_FILES[name]
+    dataset_path = os.path.join(BASE_DIR, dataset)
+    X = np.vstack([X for _, _, X in iter_chunks(name, dataset_path)])
+    extra = {
+        'model': name,
+        'model_type': {'estimator': meta['estimator'], 'kind': meta['kind']},
+        'feature_names': SCHEMAS[name].names,
+        'training_feature_names': meta['feature_names'],
+        'training_dataset': {'path': dataset, 'sha256': file_sha256(dataset_path)},
+        'reference_means': X[np.isfinite(X).all(axis=1)].mean(axis=0).tolist(),
+        'source': {'path': registry.model_files[name], 'sha256': file_sha256(sav_path)},
+        'sklearn_version': sklearn_version,
+    }
+    return write_artifact(os.path.dirname(registry.artifact_path(name)), meta, arrays, extra)
+
+
+def verify(name, registry=None):
+    """Check an artifact's checksums and that it predicts like its ``.sav`` on the training data"""
+    import pickle
+    import warnings
+
+    from batch_predict import DATASET_FILES, iter_chunks
+    from model_registry import BASE_DIR, ModelRegistry
+
+    registry = registry or ModelRegistry()
+    model = load_artifact(registry.artifact_path(name), verify=True)
+    with open(registry.sav_path(name), 'rb') as f:
+        estimator = pickle.load(f)
+    mismatches = 0
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        for _, _, X in iter_chunks(name, os.path.join(BASE_DIR, DATASET_FILES[name])):
+            mismatches += int(np.count_nonzero(model.predict(X) != estimator.predict(X)))
+    return mismatches
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    import warnings
+
+    from model_registry import MODEL_FILES
+
+    parser = argparse.ArgumentParser(description='Convert .sav models to mmap-able artifacts.')
+    parser.add_argument('command', choices=['convert', 'verify'])
+    parser.add_argument('models', nargs='*', metavar='model',
+                        help=f"models to process (default: all of {', '.join(MODEL_FILES)})")
+    args = parser.parse_args()
+    unknown = sorted(set(args.models) - set(MODEL_FILES))
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    failed = False
+    for name in args.models or MODEL_FILES:
+        if args.command == 'convert':
+            print(f'{name:14s} -> {os.path.relpath(convert(name))}')
+        else:
+            mismatches = verify(name)
+            failed |= mismatches > 0
+            print(f'{name:14s} checksums ok, mismatches={mismatches}')
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,123 @@
+"""Headless batch scoring of CSV extracts with the disease models.
+
+The input must use the same column layout as the matching file in
+``Datasets/``, or with ``--raw`` the layout of the raw thyroid / lung cancer
+extracts, which are converted on the fly (see ``preprocess.py``). The file is streamed in fixed-size chunks, each chunk is
+scored with one vectorised ``predict`` call and appended to the output, so
+memory use does not grow with the size of the input. Rows with a missing or
+infinite value are written with empty outputs and ``in_range=0``. With
+``--explain`` every row also gets a ``<column>_contribution`` column per
+feature (see ``explain.py``), computed for the whole chunk at once.
+
+    python batch_predict.py diabetes patients.csv -o scores.csv
+    python batch_predict.py thyroid --raw hypothyroid_feed.csv -o scores.csv
+    python batch_predict.py heart_disease patients.csv --explain -o explained.csv
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from inference import score_kind, score_matrix
+from model_registry import registry
+from preprocess import RAW_FORMATS, iter_raw_chunks
+from schemas import SCHEMAS
+
+# Training extract for each model, relative to the repository root
+DATASET_FILES = {
+    'diabetes': 'Datasets/diabetes_data.csv',
+    'heart_disease': 'Datasets/heart_disease_data.csv',
+    'parkinsons': 'Datasets/parkinson_data.csv',
+    'lung_cancer': 'Datasets/prepocessed_lungs_data.csv',
+    'thyroid': 'Datasets/prepocessed_hypothyroid.csv',
+}
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def iter_chunks(model_name, source, chunk_size=DEFAULT_CHUNK_SIZE, id_column=None, raw=False):
+    """Yield ``(row_offset, ids, X)`` with ``X`` a float64 matrix per chunk"""
+    if raw:
+        for offset, ids, X, _ in iter_raw_chunks(model_name, source, chunk_size, id_column):
+            yield offset, ids, X
+        return
+    columns = SCHEMAS[model_name].columns
+    usecols = columns + ([id_column] if id_column else [])
+    reader = pd.read_csv(source, usecols=usecols, chunksize=chunk_size, encoding='utf-8-sig')
+    offset = 0
+    for chunk in reader:
+        X = chunk[columns].to_numpy(dtype=np.float64)
+        ids = chunk[id_column].to_numpy() if id_column else None
+        yield offset, ids, X
+        offset += len(chunk)
+
+
+def score_csv(model_name, source, output, chunk_size=DEFAULT_CHUNK_SIZE, id_column=None, raw=False,
+              explain=False):
+    """Score ``source`` chunk by chunk and write results to ``output``; returns the row count"""
+    model = registry.get(model_name)
+    schema = SCHEMAS[model_name]
+    explainer = None
+    if explain:
+        from explain import explainer as get_explainer
+        explainer = get_explainer(model_name)
+    rows = 0
+    kind = score_kind(model)
+    for offset, ids, X in iter_chunks(model_name, source, chunk_size, id_column, raw):
+        # Rows with a missing or infinite value can't be scored; they get empty
+        # outputs (and in_range=0) instead of failing the whole run
+        finite = np.isfinite(X).all(axis=1)
+        scored = X if finite.all() else X[finite]
+        labels = pd.array(np.full(len(X), pd.NA), dtype='Int64')
+        values = np.full(len(X), np.nan)
+        if len(scored):
+            metrics.observe_batch(model_name, len(scored))
+            with metrics.timed('inference', model_name):
+                labels[finite], values[finite], _ = score_matrix(model, scored)
+        result = pd.DataFrame({'row': np.arange(offset, offset + len(X))})
+        if id_column:
+            result[id_column] = ids
+        result['prediction'] = labels
+        result[kind] = values
+        # Rows are still scored when outside the UI bounds; flag them instead
+        result['in_range'] = (~schema.out_of_range(X)).astype(np.int8)
+        if explainer is not None:
+            contributions = np.full(X.shape, np.nan)
+            if len(scored):
+                with metrics.timed('explain', model_name):
+                    contributions[finite] = explainer.contributions(scored)
+            result = pd.concat([result, pd.DataFrame(contributions, index=result.index,
+                                                     columns=[f'{c}_contribution' for c in schema.columns])], axis=1)
+        result.to_csv(output, header=(offset == 0), index=False)
+        rows += len(X)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score a CSV extract with one of the disease models.')
+    parser.add_argument('model', choices=sorted(SCHEMAS))
+    parser.add_argument('input', help='CSV in the same column layout as the Datasets/ file for this model')
+    parser.add_argument('-o', '--output', default='-', help='output CSV path (default: stdout)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'rows scored per predict call (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--id-column', help='input column copied through to the output')
+    parser.add_argument('--raw', action='store_true',
+                        help=f"input is a raw extract to preprocess first ({', '.join(RAW_FORMATS)} only)")
+    parser.add_argument('--explain', action='store_true',
+                        help='add per-feature contributions to the score for every row')
+    args = parser.parse_args(argv)
+    if args.raw and args.model not in RAW_FORMATS:
+        parser.error(f"--raw is only supported for: {', '.join(RAW_FORMATS)}")
+
+    if args.output == '-':
+        rows = score_csv(args.model, args.input, sys.stdout, args.chunk_size, args.id_column, args.raw, args.explain)
+    else:
+        with open(args.output, 'w', newline='') as f:
+            rows = score_csv(args.model, args.input, f, args.chunk_size, args.id_column, args.raw, args.explain)
+    print(f'Scored {rows} rows with {args.model}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Micro-batching of single-record predictions.
+
+Concurrent callers (Streamlit sessions, API requests) each submit one feature
+row. A per-model worker thread drains the queue into one float64 matrix and
+flushes it through a single ``predict`` call once ``max_batch_size`` rows are
+waiting or the oldest row has waited ``max_wait_ms``, whichever comes first.
+Every caller gets a future resolving to its own row of the result. Rows with
+the wrong shape or non-finite values are rejected in ``submit``; if a batch
+still fails, its rows are rescored one at a time so only the offending
+caller sees the error.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+import config
+import metrics
+from inference import score_matrix
+from model_registry import registry
+from schemas import SCHEMAS
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a batcher's queue is at ``max_queue_size``"""
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn, n_features, max_batch_size=32, max_wait_ms=2.0, max_queue_size=1024,
+                 name=None):
+        self.predict_fn = predict_fn
+        self.n_features = n_features
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._metrics = {'requests': 0, 'rejected': 0, 'batches': 0, 'rows': 0, 'errors': 0, 'split_batches': 0,
+                         'max_batch_size_seen': 0, 'max_queue_depth_seen': 0,
+                         'queue_wait_seconds': 0.0, 'predict_seconds': 0.0}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f'batcher-{name or id(self)}', daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Queue one feature row; returns a Future of ``(label, value, kind)``"""
+        if self._closed:
+            raise RuntimeError('Batcher is closed')
+        row = np.asarray(row, dtype=np.float64)
+        if row.shape != (self.n_features,):
+            raise ValueError(f"Expected {self.n_features} features for '{self.name}', got {row.size}")
+        # Checked here rather than in predict_fn, where it would fail every row coalesced with this one
+        if not np.isfinite(row).all():
+            raise ValueError(f"Input for '{self.name}' contains {'NaN' if np.isnan(row).any() else 'infinity'}")
+        future = Future()
+        try:
+            self._queue.put_nowait((row, future, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self._metrics['rejected'] += 1
+            raise QueueFullError(f"Prediction queue for '{self.name}' is full ({self.max_queue_size})") from None
+        with self._lock:
+            self._metrics['requests'] += 1
+            depth = self._queue.qsize()
+            if depth > self._metrics['max_queue_depth_seen']:
+                self._metrics['max_queue_depth_seen'] = depth
+        return future
+
+    def predict(self, row, timeout=None):
+        return self.submit(row).result(timeout)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Flush what we have, then stop on the next pass
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            X = np.empty((len(batch), self.n_features), dtype=np.float64)
+            for i, (row, _, _) in enumerate(batch):
+                X[i] = row
+            start = time.perf_counter()
+            metrics.observe_batch(self.name, len(batch))
+            try:
+                with metrics.timed('inference', self.name):
+                    labels, values, kind = self.predict_fn(X)
+            except Exception as e:
+                if len(batch) == 1:
+                    with self._lock:
+                        self._metrics['errors'] += 1
+                    batch[0][1].set_exception(e)
+                else:
+                    with self._lock:
+                        self._metrics['split_batches'] += 1
+                    self._score_each(batch)
+                continue
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                m = self._metrics
+                m['batches'] += 1
+                m['rows'] += len(batch)
+                m['predict_seconds'] += elapsed
+                m['queue_wait_seconds'] += sum(start - enqueued for _, _, enqueued in batch)
+                if len(batch) > m['max_batch_size_seen']:
+                    m['max_batch_size_seen'] = len(batch)
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result((int(labels[i]), float(values[i]), kind))
+
+    def _score_each(self, batch):
+        """Score a failed batch row by row, so each caller gets its own result or error"""
+        for row, future, _ in batch:
+            try:
+                labels, values, kind = self.predict_fn(row.reshape(1, -1))
+            except Exception as e:
+                with self._lock:
+                    self._metrics['errors'] += 1
+                future.set_exception(e)
+            else:
+                future.set_result((int(labels[0]), float(values[0]), kind))
+
+    def metrics(self):
+        with self._lock:
+            m = dict(self._metrics)
+        m.update({
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'max_queue_size': self.max_queue_size,
+            'queue_depth': self._queue.qsize(),
+            'mean_batch_size': m['rows'] / m['batches'] if m['batches'] else 0.0,
+        })
+        return m
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(name):
+    """Process-wide batcher for model ``name``, created on first use from config"""
+    batcher = _batchers.get(name)
+    if batcher is None:
+        with _batchers_lock:
+            batcher = _batchers.get(name)
+            if batcher is None:
+                batcher = MicroBatcher(
+                    lambda X: score_matrix(registry.get(name), X),
+                    len(SCHEMAS[name]),
+                    max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+                    max_wait_ms=config.MICRO_BATCH_MAX_WAIT_MS,
+                    max_queue_size=config.MICRO_BATCH_MAX_QUEUE,
+                    name=name,
+                )
+                _batchers[name] = batcher
+    return batcher
+
+
+def batching_metrics():
+    return {name: batcher.metrics() for name, batcher in _batchers.items()}
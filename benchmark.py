@@ -0,0 +1,415 @@
+"""Reproducible inference benchmarks and load test.
+
+Measures, for each of the five models, using rows sampled (with a fixed seed)
+from the ``Datasets/`` CSVs:
+
+* cold load: a fresh interpreter importing the stack and loading the model,
+  from the ``.sav`` pickle and from the converted artifact;
+* warm single-row latency (p50/p95/p99) for the raw sklearn estimator, the
+  compiled NumPy predictor and the app's scoring path;
+* batched throughput from 1 to 100k rows per call;
+* per-feature contributions (see ``explain.py``) for 10k rows, as a matrix
+  and as the API's per-row records, plus the integrated-gradients path on an
+  RBF SVC refitted on the Parkinson's data for reference;
+* a load generator driving N concurrent sessions through the scoring path
+  (in-process, or against a running ``api_server`` with ``--url``). The
+  in-process run bypasses the prediction cache unless ``--load-cache`` is
+  given, since repeated sampled rows would otherwise be cache hits; the
+  cache hit ratio over the run is recorded either way;
+* the legacy ``app.py`` handler (unpickle all five models, sleep one second,
+  predict) as a reference point;
+* the Streamlit app itself, through ``AppTest`` in a fresh interpreter: time
+  to the first complete script run (imports included, a proxy for time to
+  first paint), full rerun wall time, the page fragment's own run time (what
+  a widget change re-executes) and the HTML bytes emitted per run.
+
+Results are written as JSON; ``--compare`` fails with exit status 1 when any
+latency or throughput figure regresses by more than ``--tolerance``.
+
+    python benchmark.py -o bench.json
+    python benchmark.py -o new.json --compare bench.json --tolerance 0.2
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from batch_predict import DATASET_FILES, iter_chunks
+from model_registry import BASE_DIR, MODEL_FILES, ModelRegistry
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000, 100000)
+EXPLAIN_ROWS = 10000
+SEED = 42
+
+
+def percentiles(samples):
+    samples = np.asarray(samples, dtype=np.float64)
+    return {
+        'p50': float(np.percentile(samples, 50)),
+        'p95': float(np.percentile(samples, 95)),
+        'p99': float(np.percentile(samples, 99)),
+        'mean': float(samples.mean()),
+    }
+
+
+def _latency_us(fn, rows, iterations):
+    fn(rows[:1])
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        row = rows[i % len(rows):i % len(rows) + 1]
+        start = time.perf_counter()
+        fn(row)
+        samples[i] = time.perf_counter() - start
+    return {f'{k}_us': v * 1e6 for k, v in percentiles(samples).items()}
+
+
+@functools.lru_cache(maxsize=None)
+def _dataset_rows(name):
+    """Every row of ``name``'s training CSV, read once per run"""
+    return np.vstack([X for _, _, X in iter_chunks(name, os.path.join(BASE_DIR, DATASET_FILES[name]))])
+
+
+def _sample_rows(name, n, rng):
+    X = _dataset_rows(name)
+    return X[rng.integers(0, len(X), size=n)]
+
+
+def _load_sklearn(name):
+    import pickle
+    with open(ModelRegistry().sav_path(name), 'rb') as f:
+        return pickle.load(f)
+
+
+def bench_cold_load(name):
+    """Seconds for a fresh interpreter to import the stack and load ``name``"""
+    out = {}
+    for label, use_compiled in (('sav', False), ('artifact', True)):
+        code = (
+            'import time, warnings; warnings.simplefilter("ignore"); t = time.perf_counter()\n'
+            'from model_registry import ModelRegistry\n'
+            f'r = ModelRegistry(use_compiled={use_compiled}); r.get({name!r})\n'
+            f'print(time.perf_counter() - t, r.path({name!r}).endswith(".json"))'
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True, text=True,
+                                check=True)
+        seconds, from_artifact = result.stdout.split()
+        if label == 'artifact' and from_artifact != 'True':
+            continue  # not converted yet
+        out[f'{label}_seconds'] = float(seconds)
+    return out
+
+
+def bench_single_row(name, rows, iterations):
+    from fast_models import compile_model
+    from inference import score_row
+
+    estimator = _load_sklearn(name)
+    compiled = compile_model(estimator)
+    return {
+        'sklearn': _latency_us(estimator.predict, rows, iterations),
+        'compiled': _latency_us(compiled.predict, rows, iterations),
+        'scoring_path': _latency_us(lambda r: score_row(name, r[0]), rows, iterations),
+    }
+
+
+def bench_throughput(name, rng, sizes, repeat=3):
+    from fast_models import compile_model
+
+    estimator = _load_sklearn(name)
+    compiled = compile_model(estimator)
+    out = {'sklearn': {}, 'compiled': {}}
+    for size in sizes:
+        X = _sample_rows(name, size, rng)
+        for label, model in (('sklearn', estimator), ('compiled', compiled)):
+            best = min(_timed(model.predict, X) for _ in range(repeat))
+            out[label][f'{size}_rows_per_second'] = size / best
+    return out
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def _bench_explainer(explainer, name, X, repeat):
+    from explain import as_records
+
+    rows = len(X)
+    matrix = min(_timed(explainer.contributions, X) for _ in range(repeat))
+    records = min(_timed(lambda: as_records(name, explainer.contributions(X))) for _ in range(repeat))
+    return {
+        'method': 'exact' if explainer.exact else 'integrated_gradients',
+        f'matrix_{rows}_rows_ms': matrix * 1e3,
+        f'records_{rows}_rows_ms': records * 1e3,
+        'rows_per_second': rows / matrix,
+    }
+
+
+def bench_explain(name, rng, rows=EXPLAIN_ROWS, repeat=3):
+    """Per-feature contributions for ``rows`` sampled rows with the shipped model"""
+    from explain import explainer
+
+    return _bench_explainer(explainer(name), name, _sample_rows(name, rows, rng), repeat)
+
+
+def bench_explain_kernel(rng, rows=EXPLAIN_ROWS, repeat=3):
+    """Integrated-gradient contributions for an RBF SVC fitted on the Parkinson's data"""
+    from explain import Explainer
+    from fast_models import compile_model
+    from train import make_estimator, preprocess
+
+    X, y = preprocess('parkinsons', os.path.join(BASE_DIR, DATASET_FILES['parkinsons']))
+    model = compile_model(make_estimator('svc', {'kernel': 'rbf'}).fit(X, y))
+    return _bench_explainer(Explainer(model, X.mean(axis=0)), 'parkinsons', _sample_rows('parkinsons', rows, rng),
+                            repeat)
+
+
+def _cache_totals(url=None):
+    """``(hits, misses)`` summed over models, from this process's cache or the server's ``/metrics/cache``"""
+    if url:
+        import urllib.request
+        with urllib.request.urlopen(f"{url.rstrip('/')}/metrics/cache", timeout=10) as response:
+            stats = json.load(response)
+    else:
+        from prediction_cache import cache
+        stats = cache.stats()
+    return sum(s['hits'] for s in stats.values()), sum(s['misses'] for s in stats.values())
+
+
+def bench_load(sessions, requests_per_session, rng, url=None, models=None, use_cache=False):
+    """Drive ``sessions`` concurrent threads, each scoring single records back to back
+
+    In-process, the prediction cache is only consulted with ``use_cache``; a
+    server's cache is whatever it was started with. ``cache_hit_ratio``
+    reports the share of requests it answered either way.
+    """
+    import config
+    from prediction_cache import predict_row
+    from inference import predict_remote
+    from schemas import SCHEMAS
+
+    models = models or list(MODEL_FILES)
+    # Pre-sample each session's workload so generation cost stays out of the timings
+    workloads = []
+    for s in range(sessions):
+        picks = rng.integers(0, len(models), size=requests_per_session)
+        workloads.append([(models[m], _sample_rows(models[m], 1, rng)[0]) for m in picks])
+
+    latencies = [[] for _ in range(sessions)]
+    errors = [0] * sessions
+    barrier = threading.Barrier(sessions + 1)
+
+    def session(i):
+        barrier.wait()
+        for name, row in workloads[i]:
+            start = time.perf_counter()
+            try:
+                if url:
+                    predict_remote(url, name, [dict(zip(SCHEMAS[name].names, row.tolist()))])
+                else:
+                    predict_row(name, row)
+            except Exception:
+                errors[i] += 1
+            latencies[i].append(time.perf_counter() - start)
+
+    prediction_cache = config.PREDICTION_CACHE
+    if not url:
+        config.PREDICTION_CACHE = use_cache
+    hits, misses = _cache_totals(url)
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    try:
+        for t in threads:
+            t.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        config.PREDICTION_CACHE = prediction_cache
+    hits, misses = (after - before for after, before in zip(_cache_totals(url), (hits, misses)))
+    total = sessions * requests_per_session
+    result = {f'{k}_ms': v * 1e3 for k, v in percentiles(np.concatenate(latencies)).items()}
+    result.update(sessions=sessions, requests=total, errors=sum(errors), rows_per_second=total / elapsed,
+                  target=url or 'in-process', cache_hit_ratio=hits / (hits + misses) if hits + misses else 0.0)
+    return result
+
+
+def bench_legacy_handler(iterations, rng):
+    """The original app.py flow: unpickle every model, sleep(1), predict one row"""
+    import pickle
+
+    row = _sample_rows('diabetes', 1, rng)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        models = {}
+        for name in MODEL_FILES:
+            with open(ModelRegistry().sav_path(name), 'rb') as f:
+                models[name] = pickle.load(f)
+        time.sleep(1)
+        models['diabetes'].predict(row)
+        samples.append(time.perf_counter() - start)
+    return {f'{k}_ms': v * 1e3 for k, v in percentiles(samples).items()}
+
+
+def bench_app(script, reruns):
+    """First-run and per-rerun cost of the Streamlit app ``script``"""
+    code = f'''
+import time
+start = time.perf_counter()
+import json, sys, warnings
+warnings.simplefilter("ignore")
+sys.path.insert(0, {BASE_DIR!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({os.path.abspath(script)!r}, default_timeout=60)
+at.run()
+first = time.perf_counter() - start
+html = sum(len(m.value) for m in at.markdown)
+import metrics
+metrics.collector.reset()
+samples = []
+for i in range({reruns}):
+    widget = at.number_input[0]
+    widget.set_value(widget.min + i % 2)
+    start = time.perf_counter()
+    at.run()
+    samples.append(time.perf_counter() - start)
+fragments = [v for (stage, _), v in metrics.collector.snapshot().items() if stage == "fragment"]
+print(json.dumps({{"first": first, "html": html, "samples": samples,
+                  "fragment": [sum(v[2] for v in fragments), sum(v[0] for v in fragments)]}}))
+'''
+    env = dict(os.environ, METRICS='1')
+    result = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+                            env=env)
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    out = {'first_run_seconds': data['first'], 'html_bytes_per_run': data['html']}
+    out.update({f'rerun_{k}_ms': v * 1e3 for k, v in percentiles(data['samples']).items()})
+    total, calls = data['fragment']
+    if calls:
+        out['fragment_mean_ms'] = total / calls * 1e3
+    return out
+
+
+def run(args):
+    import sklearn
+
+    rng = np.random.default_rng(args.seed)
+    models = args.models or list(MODEL_FILES)
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+        },
+        'cold_load': {},
+        'single_row': {},
+        'throughput': {},
+    }
+    sizes = [s for s in BATCH_SIZES if s <= args.max_batch]
+    for name in models:
+        print(f'[{name}] cold load, single-row latency, throughput', file=sys.stderr)
+        results['cold_load'][name] = bench_cold_load(name)
+        results['single_row'][name] = bench_single_row(name, _sample_rows(name, 1000, rng), args.iterations)
+        results['throughput'][name] = bench_throughput(name, rng, sizes)
+    if args.explain_rows:
+        print(f'[explain] contributions for {args.explain_rows} rows', file=sys.stderr)
+        results['explain'] = {name: bench_explain(name, rng, args.explain_rows) for name in models}
+        results['explain']['parkinsons_rbf'] = bench_explain_kernel(rng, args.explain_rows)
+
+    print(f'[load] {args.sessions} sessions x {args.requests} requests', file=sys.stderr)
+    results['load'] = bench_load(args.sessions, args.requests, rng, url=args.url, models=models,
+                                 use_cache=args.load_cache)
+    if args.legacy:
+        print(f'[legacy] {args.legacy} iterations of the original handler', file=sys.stderr)
+        results['legacy_handler'] = bench_legacy_handler(args.legacy, rng)
+    if args.app_reruns:
+        print(f'[app] first run and {args.app_reruns} reruns of {args.app}', file=sys.stderr)
+        results['app'] = bench_app(args.app, args.app_reruns)
+    return results
+
+
+def _flatten(results, prefix=''):
+    for key, value in results.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            yield from _flatten(value, path + '.')
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def compare(current, baseline, tolerance):
+    """List regressions beyond ``tolerance`` (a fraction) between two result sets"""
+    base = dict(_flatten({k: v for k, v in baseline.items() if k != 'meta'}))
+    regressions = []
+    for path, value in _flatten({k: v for k, v in current.items() if k != 'meta'}):
+        old = base.get(path)
+        if not old:
+            continue
+        if path.endswith(('_us', '_ms', '_seconds')):
+            change = value / old - 1.0
+        elif path.endswith('rows_per_second'):
+            change = old / value - 1.0 if value else float('inf')
+        else:
+            continue
+        if change > tolerance:
+            regressions.append((path, old, value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark model loading, inference latency and throughput.')
+    parser.add_argument('-o', '--output', help='write JSON results here (default: stdout)')
+    parser.add_argument('--models', nargs='*', choices=sorted(MODEL_FILES), help='models to benchmark (default: all)')
+    parser.add_argument('--iterations', type=int, default=2000, help='single-row calls per measurement')
+    parser.add_argument('--max-batch', type=int, default=max(BATCH_SIZES), help='largest batch size to time')
+    parser.add_argument('--explain-rows', type=int, default=EXPLAIN_ROWS,
+                        help='rows per contribution benchmark (0 to skip)')
+    parser.add_argument('--sessions', type=int, default=16, help='concurrent sessions for the load test')
+    parser.add_argument('--requests', type=int, default=200, help='requests per session for the load test')
+    parser.add_argument('--url', help='load-test a running api_server instead of the in-process path')
+    parser.add_argument('--load-cache', action='store_true',
+                        help='score through the prediction cache in the in-process load test')
+    parser.add_argument('--legacy', type=int, default=3, help='iterations of the legacy handler (0 to skip)')
+    parser.add_argument('--app', default=os.path.join(BASE_DIR, 'app.py'), help='Streamlit script to time')
+    parser.add_argument('--app-reruns', type=int, default=20, help='reruns of the Streamlit app (0 to skip)')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--compare', help='baseline JSON to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    results = run(args)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for path, old, new, change in regressions:
+            print(f'REGRESSION {path}: {old:.4g} -> {new:.4g} ({change:+.0%})', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions beyond {args.tolerance:.0%} against {args.compare}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
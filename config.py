@@ -0,0 +1,71 @@
+"""Runtime settings for the app and inference tools, read from environment variables"""
+import os
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value not in (None, '') else default
+
+
+# Artificial pause before showing a result, for demos only. Off by default so
+# the spinner (and measured latency) reflects real inference time.
+DEMO_DELAY_SECONDS = _env_float('DEMO_DELAY_SECONDS', 0.0)
+
+# Base URL of a running api_server (e.g. http://127.0.0.1:8000). When set,
+# the Streamlit app sends predictions there instead of scoring in-process.
+INFERENCE_API_URL = os.environ.get('INFERENCE_API_URL', '').strip()
+INFERENCE_API_TIMEOUT = _env_float('INFERENCE_API_TIMEOUT', 10.0)
+
+# Micro-batching of single-record predictions (see batching.py). A batch is
+# flushed at MICRO_BATCH_MAX_SIZE rows or after MICRO_BATCH_MAX_WAIT_MS,
+# whichever comes first; submissions beyond MICRO_BATCH_MAX_QUEUE are rejected.
+MICRO_BATCHING = _env_bool('MICRO_BATCHING', True)
+MICRO_BATCH_MAX_SIZE = int(_env_float('MICRO_BATCH_MAX_SIZE', 32))
+MICRO_BATCH_MAX_WAIT_MS = _env_float('MICRO_BATCH_MAX_WAIT_MS', 2.0)
+MICRO_BATCH_MAX_QUEUE = int(_env_float('MICRO_BATCH_MAX_QUEUE', 1024))
+
+# Serve supported models through the pure-NumPy predictors in fast_models.py
+# instead of the unpickled sklearn estimators. Labels are identical (see
+# `python fast_models.py check`); set to 0 to fall back to sklearn.
+FAST_INFERENCE = _env_bool('FAST_INFERENCE', True)
+
+# Prediction cache (see prediction_cache.py). The in-process LRU holds up to
+# PREDICTION_CACHE_MAX_ENTRIES results; set PREDICTION_CACHE_DB to a SQLite
+# path to add a tier shared by all workers on the host.
+PREDICTION_CACHE = _env_bool('PREDICTION_CACHE', True)
+PREDICTION_CACHE_MAX_ENTRIES = int(_env_float('PREDICTION_CACHE_MAX_ENTRIES', 10000))
+PREDICTION_CACHE_TTL_SECONDS = _env_float('PREDICTION_CACHE_TTL_SECONDS', 3600.0)
+PREDICTION_CACHE_DB = os.environ.get('PREDICTION_CACHE_DB', '').strip()
+PREDICTION_CACHE_DB_MAX_ENTRIES = int(_env_float('PREDICTION_CACHE_DB_MAX_ENTRIES', 1000000))
+
+# Stage latency histograms, error counts and batch sizes (see metrics.py),
+# served by the API at /metrics. Off by default; METRICS_FILE additionally
+# rewrites the Prometheus text there every METRICS_DUMP_INTERVAL_SECONDS.
+METRICS = _env_bool('METRICS', False)
+METRICS_FILE = os.environ.get('METRICS_FILE', '').strip()
+METRICS_DUMP_INTERVAL_SECONDS = _env_float('METRICS_DUMP_INTERVAL_SECONDS', 15.0)
+
+# Sampling profiler: folded stacks of every thread, written to PROFILER_OUTPUT
+# when the process exits.
+PROFILER = _env_bool('PROFILER', False)
+PROFILER_INTERVAL_MS = _env_float('PROFILER_INTERVAL_MS', 10.0)
+PROFILER_OUTPUT = os.environ.get('PROFILER_OUTPUT', 'profile.folded').strip()
+
+# Input-drift monitor (see drift.py). Scored rows are buffered per model and
+# folded into running statistics once DRIFT_BUFFER_ROWS are waiting (at most
+# four times that many are held; further rows are dropped). Every
+# DRIFT_INTERVAL_SECONDS each window of at least DRIFT_MIN_ROWS rows is
+# compared with the training data, and features with a PSI above
+# DRIFT_PSI_THRESHOLD are reported as drifted.
+DRIFT_MONITOR = _env_bool('DRIFT_MONITOR', True)
+DRIFT_INTERVAL_SECONDS = _env_float('DRIFT_INTERVAL_SECONDS', 60.0)
+DRIFT_BUFFER_ROWS = int(_env_float('DRIFT_BUFFER_ROWS', 1024))
+DRIFT_MIN_ROWS = int(_env_float('DRIFT_MIN_ROWS', 200))
+DRIFT_PSI_THRESHOLD = _env_float('DRIFT_PSI_THRESHOLD', 0.2)
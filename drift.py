@@ -0,0 +1,270 @@
+"""Streaming input-drift monitor for the five models.
+
+Every scored row is appended to a small per-model buffer; that is all the
+prediction path pays. The monitor thread folds full buffers, one vectorised
+update per batch, into O(1)-memory statistics per feature:
+
+* running count, mean and variance (Chan et al.'s parallel Welford update);
+* a histogram sketch over fixed bins at the training deciles, i.e. how the
+  live rows spread across the baseline's quantiles.
+
+A background thread evaluates the statistics every ``DRIFT_INTERVAL_SECONDS``
+against baselines computed once from the training CSVs in ``Datasets/``. Each
+feature (keyed by its schema name, as used for the page's input keys) gets a
+population stability index (PSI) over the decile bins, the mean shift in
+baseline standard deviations and the variance ratio. A window is scored once
+it holds ``DRIFT_MIN_ROWS`` rows, and a fresh window then starts, so the
+scores describe recent traffic rather than everything since startup.
+
+    python drift.py check thyroid feed.csv --raw     # score a file against the baseline
+"""
+import functools
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+import config
+from schemas import SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = np.linspace(0.1, 0.9, 9)
+PSI_EPSILON = 1e-4
+
+
+class Baseline:
+    """Training-set statistics for one model: moments and decile bins per feature"""
+
+    def __init__(self, model, X):
+        X = X[np.isfinite(X).all(axis=1)]
+        self.model = model
+        self.names = SCHEMAS[model].names
+        self.rows = len(X)
+        self.mean = X.mean(axis=0)
+        self.var = X.var(axis=0)
+        # Ties (binary and small integer features) collapse to fewer, unique edges.
+        # Edges often sit on a point mass (imputed means, integer codes); widen
+        # them slightly so values equal up to rounding fall in the same bin.
+        self.edges = []
+        for j in range(X.shape[1]):
+            edges = np.unique(np.quantile(X[:, j], QUANTILES))
+            self.edges.append(edges + np.abs(edges) * 1e-9 + 1e-12)
+        self.proportions = [counts / counts.sum() for counts in _bin_counts(self.edges, X)]
+
+
+def _bin_counts(edges, X):
+    """Per-feature counts over the bins ``(-inf, e0], (e0, e1], ..., (e_last, inf)``"""
+    return [np.bincount(np.searchsorted(e, X[:, j], side='left'), minlength=len(e) + 1).astype(np.float64)
+            for j, e in enumerate(edges)]
+
+
+@functools.lru_cache(maxsize=None)
+def baseline(model):
+    """Baseline for ``model`` from its training CSV, computed once per process"""
+    from batch_predict import DATASET_FILES, iter_chunks
+    from model_registry import BASE_DIR
+
+    source = os.path.join(BASE_DIR, DATASET_FILES[model])
+    return Baseline(model, np.vstack([X for _, _, X in iter_chunks(model, source)]))
+
+
+class RunningStats:
+    """Count, mean, variance and decile-bin histogram per feature, in O(features) memory"""
+
+    def __init__(self, base):
+        self.base = base
+        self.reset()
+
+    def reset(self):
+        k = len(self.base.names)
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.bins = [np.zeros(len(e) + 1) for e in self.base.edges]
+        self.started_at = time.time()
+
+    def update(self, X):
+        X = X[np.isfinite(X).all(axis=1)]
+        n = len(X)
+        if not n:
+            return
+        mean = X.mean(axis=0)
+        m2 = ((X - mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        for counts, new in zip(self.bins, _bin_counts(self.base.edges, X)):
+            counts += new
+
+    @property
+    def var(self):
+        return self.m2 / self.count if self.count else np.zeros_like(self.m2)
+
+    def scores(self, psi_threshold):
+        """Drift of the rows seen so far against the baseline, per feature"""
+        base = self.base
+        std = np.sqrt(base.var)
+        features = {}
+        for j, name in enumerate(base.names):
+            live = np.maximum(self.bins[j] / self.count, PSI_EPSILON)
+            expected = np.maximum(base.proportions[j], PSI_EPSILON)
+            features[name] = {
+                'psi': float(np.sum((live - expected) * np.log(live / expected))),
+                'mean_shift': float((self.mean[j] - base.mean[j]) / std[j]) if std[j] > 0 else 0.0,
+                'variance_ratio': float(self.var[j] / base.var[j]) if base.var[j] > 0 else 0.0,
+                'live_mean': float(self.mean[j]),
+                'baseline_mean': float(base.mean[j]),
+            }
+        psi = {name: f['psi'] for name, f in features.items()}
+        return {
+            'rows': self.count,
+            'window_start': self.started_at,
+            'max_psi': max(psi.values()),
+            'drifted': sorted((n for n, v in psi.items() if v > psi_threshold), key=psi.get, reverse=True),
+            'features': features,
+        }
+
+
+class DriftMonitor:
+    def __init__(self, interval_seconds=60.0, buffer_rows=1024, min_rows=200, psi_threshold=0.2):
+        self.interval = interval_seconds
+        self.buffer_rows = buffer_rows
+        self.min_rows = min_rows
+        self.psi_threshold = psi_threshold
+        self._buffers = {name: [] for name in SCHEMAS}
+        self._buffered = {name: 0 for name in SCHEMAS}  # rows, not observe() calls
+        self._dropped = {name: 0 for name in SCHEMAS}
+        self._buffer_lock = threading.Lock()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._reports = {}
+        self._wake = threading.Event()
+        self._thread = None
+
+    def observe(self, name, X):
+        """Record scored rows of ``name`` (one row or a matrix); cheap, and never raises into the prediction"""
+        try:
+            if self._thread is None:
+                self._start()
+            rows = len(X) if X.ndim == 2 else 1
+            with self._buffer_lock:
+                buffered = self._buffered[name]
+                room = 4 * self.buffer_rows - buffered
+                if rows > room:
+                    # The monitor thread is behind or failing: keep what fits rather than grow or fold on the caller
+                    self._dropped[name] += rows - max(room, 0)
+                    if room <= 0:
+                        return
+                    X, rows = np.array(X[:room]), room
+                self._buffers[name].append(X)
+                self._buffered[name] = buffered + rows
+            if buffered < self.buffer_rows <= buffered + rows:
+                self._wake.set()  # fold on the monitor thread
+        except Exception:
+            logger.exception('Drift monitor could not record rows for %s', name)
+
+    def _start(self):
+        with self._buffer_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='drift-monitor', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        # A failing model (e.g. an unreadable training CSV) is logged and its rows discarded; the thread lives on
+        next_evaluation = time.monotonic() + self.interval
+        while True:
+            self._wake.wait(max(0.0, next_evaluation - time.monotonic()))
+            self._wake.clear()
+            for name in SCHEMAS:
+                try:
+                    self._fold(name)
+                except Exception:
+                    logger.exception('Drift monitor could not fold rows for %s', name)
+            if time.monotonic() >= next_evaluation:
+                try:
+                    self.evaluate()
+                except Exception:
+                    logger.exception('Drift evaluation failed')
+                next_evaluation += self.interval
+
+    def _fold(self, name):
+        with self._buffer_lock:
+            rows, self._buffers[name] = self._buffers[name], []
+            self._buffered[name] = 0
+        if not rows:
+            return
+        X = np.concatenate(rows, axis=None).astype(np.float64, copy=False).reshape(-1, len(SCHEMAS[name]))
+        with self._stats_lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = RunningStats(baseline(name))
+            stats.update(X)
+
+    def evaluate(self, force=False):
+        """Score every window holding at least ``min_rows`` rows (any rows with ``force``) and start a new one"""
+        for name in SCHEMAS:
+            self._fold(name)
+        with self._stats_lock:
+            for name, stats in self._stats.items():
+                if stats.count and (force or stats.count >= self.min_rows):
+                    self._reports[name] = dict(stats.scores(self.psi_threshold), evaluated_at=time.time())
+                    stats.reset()
+        return self.report()
+
+    def report(self):
+        """Latest drift scores per model, plus the rows waiting in the current window"""
+        with self._stats_lock:
+            pending = {name: stats.count for name, stats in self._stats.items()}
+            out = {name: dict(report) for name, report in self._reports.items()}
+        with self._buffer_lock:
+            for name, rows in self._buffered.items():
+                pending[name] = pending.get(name, 0) + rows
+            dropped = dict(self._dropped)
+        for name, count in pending.items():
+            if count:
+                out.setdefault(name, {})['pending_rows'] = count
+        for name, count in dropped.items():
+            if count:
+                out.setdefault(name, {})['dropped'] = count
+        return out
+
+
+# Shared by every Streamlit session and API request in this process
+monitor = DriftMonitor(
+    interval_seconds=config.DRIFT_INTERVAL_SECONDS,
+    buffer_rows=config.DRIFT_BUFFER_ROWS,
+    min_rows=config.DRIFT_MIN_ROWS,
+    psi_threshold=config.DRIFT_PSI_THRESHOLD,
+)
+
+
+def observe(name, X):
+    if config.DRIFT_MONITOR:
+        monitor.observe(name, X)
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    from batch_predict import iter_chunks
+
+    parser = argparse.ArgumentParser(description='Score a CSV extract for drift against the training data.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    check = sub.add_parser('check', help='drift of one file against the baseline')
+    check.add_argument('model', choices=sorted(SCHEMAS))
+    check.add_argument('input', help='CSV in the layout of the Datasets/ file (or a raw extract with --raw)')
+    check.add_argument('--raw', action='store_true', help='input is a raw thyroid / lung cancer extract')
+    check.add_argument('--threshold', type=float, default=config.DRIFT_PSI_THRESHOLD,
+                       help='PSI above which a feature is reported as drifted')
+    args = parser.parse_args()
+
+    stats = RunningStats(baseline(args.model))
+    for _, _, X in iter_chunks(args.model, args.input, raw=args.raw):
+        stats.update(X)
+    print(json.dumps(stats.scores(args.threshold), indent=2))
@@ -0,0 +1,233 @@
+"""Pure-NumPy inference for the fitted sklearn estimators.
+
+``export_params`` pulls the fitted parameters out of a ``LogisticRegression``
+or ``SVC`` (optionally behind a ``StandardScaler`` in a ``Pipeline``) into
+flat arrays plus a small dict of scalar metadata. ``CompiledModel``
+evaluates them with plain NumPy, skipping sklearn's per-call validation and
+dispatch. Linear-kernel SVCs are collapsed to a single weight vector at
+export time, so every model shipped today is one dot product per row.
+
+    python fast_models.py check   # label parity against every row in Datasets/
+    python fast_models.py bench   # per-call latency, sklearn vs compiled
+"""
+import numpy as np
+
+
+class UnsupportedModelError(TypeError):
+    """Raised by ``export_params`` for estimators it cannot flatten"""
+
+
+def export_params(estimator):
+    """Flatten a fitted binary classifier into ``(meta, arrays)``
+
+    ``meta`` holds JSON-serialisable scalars, ``arrays`` holds float64 NumPy
+    arrays; together they are everything ``CompiledModel`` needs.
+    """
+    arrays = {}
+    steps = getattr(estimator, 'steps', None)
+    if steps is not None:
+        *transforms, (_, estimator) = steps
+        if len(transforms) > 1:
+            raise UnsupportedModelError('Only a single StandardScaler step is supported')
+        for _, scaler in transforms:
+            if type(scaler).__name__ != 'StandardScaler':
+                raise UnsupportedModelError(f'Unsupported pipeline step {type(scaler).__name__}')
+            n = scaler.n_features_in_
+            arrays['mean'] = np.asarray(scaler.mean_ if scaler.with_mean else np.zeros(n), dtype=np.float64)
+            arrays['scale'] = np.asarray(scaler.scale_ if scaler.with_std else np.ones(n), dtype=np.float64)
+
+    classes = np.asarray(estimator.classes_)
+    if len(classes) != 2:
+        raise UnsupportedModelError('Only binary classifiers are supported')
+    arrays['classes'] = classes.astype(np.float64)
+    meta = {
+        'estimator': type(estimator).__name__,
+        'n_features': int(estimator.n_features_in_),
+        'feature_names': [str(f) for f in getattr(estimator, 'feature_names_in_', [])],
+    }
+
+    name = type(estimator).__name__
+    if name == 'LogisticRegression':
+        meta.update(kind='linear', probability=True)
+        arrays['coef'] = np.asarray(estimator.coef_, dtype=np.float64).ravel()
+        arrays['intercept'] = np.asarray(estimator.intercept_, dtype=np.float64).ravel()
+    elif name == 'SVC':
+        # Binary SVC: decision = K(X, SV) @ dual_coef + intercept, positive -> classes_[1]
+        dual_coef = np.asarray(estimator.dual_coef_, dtype=np.float64).ravel()
+        support_vectors = np.asarray(estimator.support_vectors_, dtype=np.float64)
+        arrays['intercept'] = np.asarray(estimator.intercept_, dtype=np.float64).ravel()
+        if estimator.kernel == 'linear':
+            meta.update(kind='linear', probability=False)
+            arrays['coef'] = dual_coef @ support_vectors
+        elif estimator.kernel in ('rbf', 'poly', 'sigmoid'):
+            meta.update(kind='kernel', probability=False, kernel=estimator.kernel,
+                        gamma=float(estimator._gamma), coef0=float(estimator.coef0),
+                        degree=int(estimator.degree))
+            arrays['dual_coef'] = dual_coef
+            arrays['support_vectors'] = support_vectors
+        else:
+            raise UnsupportedModelError(f'Unsupported SVC kernel {estimator.kernel!r}')
+    else:
+        raise UnsupportedModelError(f'Unsupported estimator {name}')
+    return meta, arrays
+
+
+class CompiledModel:
+    """NumPy predictor mirroring the sklearn ``predict``/``decision_function`` API"""
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.arrays = arrays
+        self.kind = meta['kind']
+        self.probability = meta['probability']
+        self.n_features_in_ = meta['n_features']
+        self.classes_ = arrays['classes']
+        self._mean = arrays.get('mean')
+        self._scale = arrays.get('scale')
+        self._intercept = float(arrays['intercept'][0])
+        if self.kind == 'linear':
+            self._coef = arrays['coef']
+        else:
+            self._kernel = meta['kernel']
+            self._gamma = meta['gamma']
+            self._coef0 = meta['coef0']
+            self._degree = meta['degree']
+            self._dual_coef = arrays['dual_coef']
+            self._sv = arrays['support_vectors']
+            self._sv_sq = np.einsum('ij,ij->i', self._sv, self._sv)
+
+    def _prepare(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f'X has {X.shape[1]} features, but the model expects {self.n_features_in_}')
+        # As sklearn's check_array: NaN would otherwise compare as "not positive" and score as class 0
+        if not np.isfinite(X).all():
+            raise ValueError(f"Input X contains {'NaN' if np.isnan(X).any() else 'infinity'}.")
+        if self._mean is not None:
+            X = (X - self._mean) / self._scale
+        return X
+
+    def _kernel_matrix(self, X):
+        dots = X @ self._sv.T
+        if self._kernel == 'rbf':
+            sq = np.einsum('ij,ij->i', X, X)[:, None] - 2.0 * dots + self._sv_sq[None, :]
+            np.maximum(sq, 0.0, out=sq)
+            return np.exp(-self._gamma * sq)
+        if self._kernel == 'poly':
+            return (self._gamma * dots + self._coef0) ** self._degree
+        return np.tanh(self._gamma * dots + self._coef0)
+
+    def decision_function(self, X):
+        X = self._prepare(X)
+        if self.kind == 'linear':
+            return X @ self._coef + self._intercept
+        return self._kernel_matrix(X) @ self._dual_coef + self._intercept
+
+    def gradient(self, X):
+        """Gradient of ``decision_function`` with respect to each (unscaled) input row"""
+        Z = self._prepare(X)
+        if self.kind == 'linear':
+            grad = np.broadcast_to(self._coef, Z.shape)
+        else:
+            dots = Z @ self._sv.T
+            if self._kernel == 'rbf':
+                # d/dz exp(-g|z - s|^2) = -2g (z - s) K
+                weighted = self._kernel_matrix(Z) * self._dual_coef
+                grad = -2.0 * self._gamma * (weighted.sum(axis=1)[:, None] * Z - weighted @ self._sv)
+            elif self._kernel == 'poly':
+                base = self._gamma * dots + self._coef0
+                weighted = self._dual_coef * self._degree * self._gamma * base ** (self._degree - 1)
+                grad = weighted @ self._sv
+            else:
+                weighted = self._dual_coef * self._gamma * (1.0 - np.tanh(self._gamma * dots + self._coef0) ** 2)
+                grad = weighted @ self._sv
+        if self._scale is not None:
+            grad = grad / self._scale
+        return grad
+
+    def predict(self, X):
+        positive = self.decision_function(X) > 0
+        return np.where(positive, self.classes_[1], self.classes_[0]).astype(np.int64)
+
+    def predict_proba(self, X):
+        if not self.probability:
+            raise AttributeError('predict_proba is not available when the model was fitted without probabilities')
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+
+def compile_model(estimator):
+    """``CompiledModel`` for ``estimator``, or the estimator itself if unsupported"""
+    try:
+        return CompiledModel(*export_params(estimator))
+    except UnsupportedModelError:
+        return estimator
+
+
+def _load_datasets():
+    import os
+
+    from batch_predict import DATASET_FILES, iter_chunks
+    from model_registry import BASE_DIR
+
+    for name, path in DATASET_FILES.items():
+        X = np.vstack([X for _, _, X in iter_chunks(name, os.path.join(BASE_DIR, path))])
+        yield name, X
+
+
+def _load_sklearn(name):
+    import pickle
+    from model_registry import ModelRegistry
+
+    with open(ModelRegistry().sav_path(name), 'rb') as f:
+        return pickle.load(f)
+
+
+def check_parity():
+    """Compare compiled and sklearn labels on every dataset row; returns True on parity"""
+    ok = True
+    for name, X in _load_datasets():
+        estimator = _load_sklearn(name)
+        compiled = compile_model(estimator)
+        expected = estimator.predict(X)
+        got = compiled.predict(X)
+        mismatches = int(np.count_nonzero(expected != got))
+        max_diff = float(np.max(np.abs(estimator.decision_function(X) - compiled.decision_function(X))))
+        ok &= mismatches == 0
+        print(f'{name:14s} rows={len(X):5d} mismatches={mismatches} max|decision diff|={max_diff:.3e}')
+    return ok
+
+
+def benchmark(repeat=2000):
+    import time
+
+    print(f"{'model':14s} {'sklearn us/call':>16s} {'compiled us/call':>17s} {'speedup':>8s}")
+    for name, X in _load_datasets():
+        estimator = _load_sklearn(name)
+        compiled = compile_model(estimator)
+        row = X[:1]
+        timings = []
+        for model in (estimator, compiled):
+            model.predict(row)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                model.predict(row)
+            timings.append((time.perf_counter() - start) / repeat * 1e6)
+        print(f'{name:14s} {timings[0]:16.1f} {timings[1]:17.1f} {timings[0] / timings[1]:7.1f}x')
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    import warnings
+
+    parser = argparse.ArgumentParser(description='Parity check and benchmark for the compiled models.')
+    parser.add_argument('command', choices=['check', 'bench'])
+    parser.add_argument('--repeat', type=int, default=2000, help='predict calls per model for bench')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    if args.command == 'check':
+        sys.exit(0 if check_parity() else 1)
+    benchmark(args.repeat)
@@ -0,0 +1,112 @@
+"""Shared inference path used by the Streamlit app, the batch CLI and the HTTP API"""
+import json
+import logging
+import urllib.request
+import warnings
+
+import numpy as np
+
+import metrics
+from model_registry import registry
+from schemas import SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+def score_kind(model):
+    """``'probability'`` for models fitted with probability estimates, ``'score'`` otherwise"""
+    return 'probability' if getattr(model, 'probability', True) and hasattr(model, 'predict_proba') else 'score'
+
+
+def score_matrix(model, X):
+    """Predict labels for a feature matrix, plus probabilities or decision scores
+
+    Returns ``(labels, values, kind)`` with ``kind`` from ``score_kind`` (the
+    SVCs were trained without ``probability=True``, so they give scores).
+    """
+    with warnings.catch_warnings():
+        # The estimators were fitted on DataFrames; scoring bare arrays is intentional
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        labels = model.predict(X)
+        if score_kind(model) == 'probability':
+            return labels, model.predict_proba(X)[:, 1], 'probability'
+        return labels, model.decision_function(X), 'score'
+
+
+def predict_matrix(name, X, explain=False):
+    """Score a feature matrix with the registry's model for ``name``
+
+    With ``explain`` the result also carries ``contributions``: one
+    ``{feature name: contribution}`` dict per row (see ``explain.py``), or
+    ``None`` when the model can't be explained.
+    """
+    from drift import observe
+
+    X = np.asarray(X, dtype=np.float64)
+    observe(name, X)
+    model = registry.get(name)
+    metrics.observe_batch(name, len(X))
+    with metrics.timed('inference', name):
+        labels, values, kind = score_matrix(model, X)
+    result = {
+        'model': name,
+        'labels': labels.astype(int).tolist(),
+        'probabilities': values.tolist() if kind == 'probability' else None,
+        'scores': values.tolist() if kind == 'score' else None,
+    }
+    if explain:
+        result['contributions'] = try_explain_matrix(name, X)
+    return result
+
+
+def explain_matrix(name, X):
+    """Per-row ``{feature name: contribution}`` dicts for a feature matrix"""
+    from explain import as_records, contributions
+
+    with metrics.timed('explain', name):
+        return as_records(name, contributions(name, X))
+
+
+def try_explain_matrix(name, X):
+    """``explain_matrix``, or ``None`` if it fails; explanations never fail a prediction"""
+    try:
+        return explain_matrix(name, X)
+    except Exception as e:
+        # e.g. an estimator fast_models can't flatten, or no training means for the reference
+        logger.warning("No explanations for '%s': %s", name, e)
+        return None
+
+
+def score_row(name, row):
+    """``(label, value, kind)`` for a single feature row"""
+    model = registry.get(name)
+    metrics.observe_batch(name, 1)
+    with metrics.timed('inference', name):
+        labels, values, kind = score_matrix(model, np.reshape(row, (1, -1)).astype(np.float64))
+    return int(labels[0]), float(values[0]), kind
+
+
+def records_to_matrix(name, records):
+    """Validated float64 matrix for ``{feature name: value}`` records"""
+    schema = SCHEMAS[name]
+    return schema.validate(schema.matrix(records))
+
+
+def predict_records(name, records, explain=False):
+    return predict_matrix(name, records_to_matrix(name, records), explain)
+
+
+def post_json(base_url, path, payload, timeout=10.0):
+    """POST ``payload`` to the HTTP inference service at ``base_url`` and decode the reply"""
+    request = urllib.request.Request(
+        f"{base_url.rstrip('/')}{path}",
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)
+
+
+def predict_remote(base_url, name, records, timeout=10.0, explain=False):
+    """Score records through the HTTP inference service at ``base_url``"""
+    return post_json(base_url, f"/predict/{name}{'?explain=true' if explain else ''}", records, timeout)
@@ -0,0 +1,262 @@
+"""Hot-path instrumentation: per-stage latency histograms, call and error counts
+and batch sizes per model, exported in the Prometheus text format.
+
+Stages recorded:
+
+* ``rerun``: one full Streamlit script run, labelled with the page's model;
+* ``fragment``: one run of the selected page's fragment (a widget change on
+  the page re-executes only this, not the whole script);
+* ``input_assembly``: building the feature matrix from the form widgets;
+* ``predict``: the page handler's prediction call (cache, batcher or API);
+* ``render``: writing the result HTML with ``show_result``;
+* ``model_load``: unpickling or mapping a model in the registry;
+* ``inference``: one vectorised model call, with its batch size;
+* ``explain``: per-feature contributions for a matrix (see ``explain.py``);
+* ``request``: one ``POST /predict`` in the API server.
+
+Hooks are ``with metrics.timed(stage, model): ...``. While ``METRICS`` is off
+``timed`` returns a shared no-op context manager, so a disabled hook costs one
+global lookup and two empty method calls.
+
+The API server exposes the text at ``GET /metrics``; set ``METRICS_FILE`` to
+have any process (e.g. Streamlit) rewrite it periodically and at exit. With
+``PROFILER`` set, a sampling profiler records every thread's stack each
+``PROFILER_INTERVAL_MS`` and writes folded stacks (flamegraph input) to
+``PROFILER_OUTPUT``.
+"""
+import atexit
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import config
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 1024, 10000, 100000)
+
+ENABLED = config.METRICS
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}  # (stage, model) -> Histogram
+        self._errors = Counter()  # (stage, model) -> count
+        self._batch_sizes = {}  # model -> Histogram
+
+    def observe(self, stage, model, seconds, error=False):
+        key = (stage, model)
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            if error:
+                self._errors[key] += 1
+
+    def observe_batch(self, model, size):
+        with self._lock:
+            histogram = self._batch_sizes.get(model)
+            if histogram is None:
+                histogram = self._batch_sizes[model] = Histogram(BATCH_SIZE_BUCKETS)
+            histogram.observe(size)
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._errors.clear()
+            self._batch_sizes.clear()
+
+    def snapshot(self):
+        """``{(stage, model): (calls, errors, total_seconds)}``"""
+        with self._lock:
+            return {key: (h.count, self._errors.get(key, 0), h.sum) for key, h in self._latency.items()}
+
+    def render(self):
+        """Prometheus text exposition (format 0.0.4)"""
+        lines = [
+            '# HELP prediction_stage_seconds Latency of each instrumented stage.',
+            '# TYPE prediction_stage_seconds histogram',
+        ]
+        with self._lock:
+            latency = {k: (list(h.counts), h.sum, h.count) for k, h in sorted(self._latency.items())}
+            errors = dict(self._errors)
+            batch_sizes = {k: (list(h.counts), h.sum, h.count) for k, h in sorted(self._batch_sizes.items())}
+        for (stage, model), values in latency.items():
+            _histogram_lines(lines, 'prediction_stage_seconds', f'stage="{stage}",model="{model}"',
+                             LATENCY_BUCKETS, *values)
+        lines += [
+            '# HELP prediction_stage_errors_total Calls of each stage that raised.',
+            '# TYPE prediction_stage_errors_total counter',
+        ]
+        for stage, model in latency:
+            lines.append(f'prediction_stage_errors_total{{stage="{stage}",model="{model}"}} '
+                         f'{errors.get((stage, model), 0)}')
+        lines += [
+            '# HELP prediction_batch_size Rows per vectorised model call.',
+            '# TYPE prediction_batch_size histogram',
+        ]
+        for model, values in batch_sizes.items():
+            _histogram_lines(lines, 'prediction_batch_size', f'model="{model}"', BATCH_SIZE_BUCKETS, *values)
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(lines, metric, labels, buckets, counts, total, count):
+    cumulative = 0
+    for bound, n in zip(buckets, counts):
+        cumulative += n
+        lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {count}')
+    lines.append(f'{metric}_sum{{{labels}}} {total:.9g}')
+    lines.append(f'{metric}_count{{{labels}}} {count}')
+
+
+collector = Metrics()
+
+
+class _Timer:
+    __slots__ = ('stage', 'model', 'start')
+
+    def __init__(self, stage, model):
+        self.stage = stage
+        self.model = model
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        collector.observe(self.stage, self.model, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def timed(stage, model=''):
+    """Context manager recording the duration (and failure) of ``stage`` for ``model``"""
+    if not ENABLED:
+        return _NOOP
+    return _Timer(stage, model)
+
+
+def observe(stage, model, seconds, error=False):
+    if ENABLED:
+        collector.observe(stage, model, seconds, error)
+
+
+def observe_batch(model, size):
+    if ENABLED:
+        collector.observe_batch(model, size)
+
+
+def render():
+    return collector.render()
+
+
+def dump(path):
+    """Write the Prometheus text to ``path`` atomically"""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+def _dump_periodically(path, interval):
+    while True:
+        time.sleep(interval)
+        dump(path)
+
+
+# -- sampling profiler -----------------------------------------------------------
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval into folded-stack counts"""
+
+    def __init__(self, interval_ms=10.0):
+        self.interval = interval_ms / 1000.0
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def write(self, path):
+        """Write ``stack count`` lines, the input format of flamegraph.pl and speedscope"""
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+profiler = None
+
+
+def start_profiler(interval_ms=None, output=None):
+    """Start the process-wide sampling profiler; its samples are written to ``output`` at exit"""
+    global profiler
+    if profiler is None:
+        profiler = SamplingProfiler(interval_ms or config.PROFILER_INTERVAL_MS).start()
+        atexit.register(lambda: profiler.write(output or config.PROFILER_OUTPUT))
+    return profiler
+
+
+if ENABLED and config.METRICS_FILE:
+    threading.Thread(target=_dump_periodically, args=(config.METRICS_FILE, config.METRICS_DUMP_INTERVAL_SECONDS),
+                     name='metrics-dump', daemon=True).start()
+    atexit.register(dump, config.METRICS_FILE)
+
+if config.PROFILER:
+    start_profiler()
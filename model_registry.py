@@ -0,0 +1,203 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import config
+import metrics
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Model key -> pickled estimator, relative to the repository root
+MODEL_FILES = {
+    'diabetes': 'Models/diabetes_model.sav',
+    'heart_disease': 'Models/heart_disease_model.sav',
+    'parkinsons': 'Models/parkinsons_model.sav',
+    'lung_cancer': 'Models/lungs_disease_model.sav',
+    'thyroid': 'Models/Thyroid_model.sav',
+}
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hash a file in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat(path):
+    """``(mtime_ns, size)`` of ``path``, or ``None`` when it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class _Entry:
+    __slots__ = ('model', 'path', 'sha256', 'sav_stat', 'sav_sha256', 'artifact_stat')
+
+    def __init__(self, model, path, sha256, sav_stat, sav_sha256, artifact_stat):
+        self.model = model
+        self.path = path
+        self.sha256 = sha256
+        self.sav_stat = sav_stat
+        self.sav_sha256 = sav_sha256
+        self.artifact_stat = artifact_stat
+
+
+class ModelRegistry:
+    """Process-wide, lazily populated cache of the disease models.
+
+    A model is unpickled the first time it is requested and kept in memory.
+    Each lookup stats the backing files; a file is only re-hashed when its
+    mtime or size moved, and the model only re-loaded when a hash changed.
+
+    With ``use_compiled=True`` the registry serves ``fast_models.CompiledModel``
+    predictors: from the pickle-free artifact in ``Models/<model>/`` when it
+    was converted from the current ``.sav`` (its manifest records the source
+    hash), otherwise by compiling the unpickled estimator. The ``.sav`` is
+    watched either way, so dropping in a new one reloads the model even
+    while a stale artifact is still on disk.
+    """
+
+    def __init__(self, model_files=None, base_dir=BASE_DIR, use_compiled=False):
+        self.model_files = dict(MODEL_FILES if model_files is None else model_files)
+        self.base_dir = base_dir
+        self.use_compiled = use_compiled
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in self.model_files}
+        self._stats = {name: {'hits': 0, 'misses': 0, 'reloads': 0, 'loads': 0, 'load_seconds': 0.0}
+                       for name in self.model_files}
+
+    def sav_path(self, name):
+        if name not in self.model_files:
+            raise KeyError(f"Unknown model '{name}'. Available: {', '.join(self.model_files)}")
+        return os.path.join(self.base_dir, self.model_files[name])
+
+    def artifact_path(self, name):
+        """Manifest of the converted artifact for ``name`` (which may not exist yet)"""
+        return os.path.join(os.path.dirname(self.sav_path(name)), name, 'manifest.json')
+
+    def _artifact_source(self, artifact):
+        """SHA-256 of the ``.sav`` the artifact was converted from, or ``None`` if unreadable"""
+        from artifacts import ArtifactError, read_manifest
+        try:
+            return read_manifest(artifact).get('source', {}).get('sha256')
+        except (ArtifactError, OSError, ValueError):
+            return None
+
+    def _resolve(self, name, sav_sha256):
+        """File to load ``name`` from, given the hash of its current ``.sav``"""
+        if self.use_compiled:
+            artifact = self.artifact_path(name)
+            if os.path.exists(artifact) and self._artifact_source(artifact) == sav_sha256:
+                return artifact
+        return self.sav_path(name)
+
+    def path(self, name):
+        """File the model is actually loaded from (not counted as a lookup)"""
+        if name in self._entries:
+            return self._current(name)[0].path
+        return self._resolve(name, file_sha256(self.sav_path(name)))
+
+    def _load(self, path):
+        if path.endswith('.json'):
+            from artifacts import load_artifact
+            return load_artifact(path)
+        with open(path, 'rb') as f:
+            model = pickle.load(f)
+        if self.use_compiled:
+            from fast_models import compile_model
+            model = compile_model(model)
+        return model
+
+    def names(self):
+        return list(self.model_files)
+
+    def _stats_of(self, name):
+        sav_stat = _stat(self.sav_path(name))
+        if sav_stat is None:
+            raise FileNotFoundError(f"Model file for '{name}' not found: {self.sav_path(name)}")
+        artifact_stat = _stat(self.artifact_path(name)) if self.use_compiled else None
+        return sav_stat, artifact_stat
+
+    def get(self, name):
+        """Return the model for ``name``, loading or reloading it if needed"""
+        entry, loaded = self._current(name)
+        if not loaded:
+            self._count(name, 'hits')
+        return entry.model
+
+    def _current(self, name):
+        """``(entry, loaded)`` for ``name``, up to date with the files on disk; only loads are counted"""
+        sav_stat, artifact_stat = self._stats_of(name)
+        entry = self._entries.get(name)
+        if entry is not None and entry.sav_stat == sav_stat and entry.artifact_stat == artifact_stat:
+            return entry, False
+
+        # Serialise loads per model so concurrent sessions don't unpickle twice
+        with self._load_locks[name]:
+            sav_stat, artifact_stat = self._stats_of(name)
+            entry = self._entries.get(name)
+            if entry is not None and entry.sav_stat == sav_stat and entry.artifact_stat == artifact_stat:
+                return entry, False
+
+            if entry is not None and entry.sav_stat == sav_stat:
+                sav_sha256 = entry.sav_sha256
+            else:
+                sav_sha256 = file_sha256(self.sav_path(name))
+            path = self._resolve(name, sav_sha256)
+            sha256 = sav_sha256 if path == self.sav_path(name) else file_sha256(path)
+            if entry is not None and entry.path == path and entry.sha256 == sha256:
+                # Touched but unchanged: keep the loaded model
+                entry = self._entries[name] = _Entry(entry.model, path, sha256, sav_stat, sav_sha256, artifact_stat)
+                return entry, False
+
+            start = time.perf_counter()
+            with metrics.timed('model_load', name):
+                model = self._load(path)
+            elapsed = time.perf_counter() - start
+
+            new = self._entries[name] = _Entry(model, path, sha256, sav_stat, sav_sha256, artifact_stat)
+            with self._lock:
+                stats = self._stats[name]
+                stats['misses'] += 1
+                stats['loads'] += 1
+                stats['load_seconds'] += elapsed
+                if entry is not None:
+                    stats['reloads'] += 1
+            return new, True
+
+    __getitem__ = get
+
+    def __contains__(self, name):
+        return name in self.model_files
+
+    def sha256(self, name):
+        """Hash of the file ``name`` is loaded from; changes whenever its ``.sav`` does (not counted as a lookup)"""
+        return self._current(name)[0].sha256
+
+    def preload(self, names=None):
+        for name in names or self.model_files:
+            self.get(name)
+
+    def _count(self, name, key):
+        with self._lock:
+            self._stats[name][key] += 1
+
+    def stats(self):
+        """Per-model hit/miss/reload counters and cumulative load time"""
+        with self._lock:
+            out = {}
+            for name, stats in self._stats.items():
+                out[name] = dict(stats, loaded=name in self._entries)
+            return out
+
+
+# Shared by every Streamlit session and rerun in this process
+registry = ModelRegistry(use_compiled=config.FAST_INFERENCE)
@@ -0,0 +1,120 @@
+"""Full-panel screening: score one patient against every applicable model at once.
+
+A panel record uses the union of the per-model features, keyed by the schema
+feature names, except for the shared ``age`` and ``sex`` fields (sex is
+``1 = male; 0 = female``) which are fanned out to each model's own column and
+encoding. Every model whose features are all present is scored in parallel on
+a shared thread pool, so a panel costs about as much as its slowest model.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from schemas import SCHEMAS, Feature
+
+DISPLAY_NAMES = {
+    'diabetes': 'Diabetes',
+    'heart_disease': 'Heart Disease',
+    'parkinsons': "Parkinson's Disease",
+    'lung_cancer': 'Lung Cancer',
+    'thyroid': 'Hypo-Thyroidism',
+}
+
+SHARED_FEATURES = (
+    Feature('age', 'Age', 'Enter age of the person', 0, 120),
+    Feature('sex', 'Sex (1 = Male; 0 = Female)', 'Enter sex of the person', 0, 1),
+)
+
+# (model, feature name) -> (panel key, transform from the panel encoding)
+_ALIASES = {
+    ('diabetes', 'Age'): ('age', None),
+    ('heart_disease', 'age'): ('age', None),
+    ('heart_disease', 'sex'): ('sex', None),
+    ('lung_cancer', 'AGE'): ('age', None),
+    ('lung_cancer', 'GENDER'): ('sex', None),
+    ('thyroid', 'age'): ('age', None),
+    ('thyroid', 'sex'): ('sex', lambda v: 1 - v),  # thyroid data encodes female as 1
+}
+
+
+def model_features(model):
+    """Features of ``model`` collected separately from the shared fields"""
+    return [f for f in SCHEMAS[model] if (model, f.name) not in _ALIASES]
+
+
+def panel_matrix(model, record):
+    """1-row feature matrix for ``model`` from a panel record; ``KeyError`` lists missing keys"""
+    schema = SCHEMAS[model]
+    X = schema.empty()
+    missing = []
+    for j, feature in enumerate(schema):
+        key, transform = _ALIASES.get((model, feature.name), (feature.name, None))
+        if key not in record:
+            missing.append(key)
+            continue
+        value = float(record[key])
+        X[0, j] = transform(value) if transform else value
+    if missing:
+        raise KeyError(missing)
+    return X
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=len(SCHEMAS), thread_name_prefix='panel')
+    return _executor
+
+
+def _timed_predict(model, X, explain=False):
+    from inference import predict_matrix
+
+    start = time.perf_counter()
+    result = predict_matrix(model, X, explain)
+    return result, (time.perf_counter() - start) * 1000.0
+
+
+def score_panel(record, models=None, explain=False):
+    """Score ``record`` with every applicable model in parallel
+
+    Returns ``{'results': {model: {...}}, 'skipped': {model: reason}, 'total_ms': float}``;
+    each result carries its label, probability or score, and ``latency_ms``
+    (and, with ``explain``, its ``contributions`` keyed by feature name, or
+    ``None``).
+    Models with missing or out-of-range inputs are reported under ``skipped``
+    rather than failing the whole panel.
+    """
+    start = time.perf_counter()
+    skipped = {}
+    futures = {}
+    executor = _get_executor()
+    for model in models or SCHEMAS:
+        try:
+            X = SCHEMAS[model].validate(panel_matrix(model, record))
+        except KeyError as e:
+            skipped[model] = f"missing {', '.join(e.args[0])}"
+            continue
+        except (TypeError, ValueError) as e:
+            skipped[model] = str(e)
+            continue
+        futures[model] = executor.submit(_timed_predict, model, X, explain)
+
+    results = {}
+    for model, future in futures.items():
+        result, latency_ms = future.result()
+        results[model] = {
+            'label': result['labels'][0],
+            'probability': result['probabilities'][0] if result['probabilities'] else None,
+            'score': result['scores'][0] if result['scores'] else None,
+            'latency_ms': latency_ms,
+        }
+        if explain:
+            contributions = result['contributions']
+            results[model]['contributions'] = contributions[0] if contributions else None
+    return {'results': results, 'skipped': skipped, 'total_ms': (time.perf_counter() - start) * 1000.0}
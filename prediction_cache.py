@@ -0,0 +1,242 @@
+"""Content-addressed cache of single-record predictions.
+
+Keys are derived from the model's artifact hash (as tracked by the registry)
+and the canonicalised float64 feature vector, so a re-assessed patient or a
+Streamlit rerun with identical inputs is answered without touching the
+model. Replacing a ``.sav``/artifact changes its hash, which both changes
+every key and purges the stale entries for that model.
+
+Two tiers:
+
+* an in-process LRU bounded by entry count, with a TTL;
+* an optional SQLite file shared by every worker on the host, with the same
+  TTL and its own entry cap (oldest rows are evicted first).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import config
+from model_registry import registry
+
+
+def canonical_key(name, artifact_sha256, row):
+    """Cache key for one feature row of model ``name``"""
+    row = np.ascontiguousarray(row, dtype=np.float64) + 0.0  # folds -0.0 into 0.0
+    digest = hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest()
+    return f'{name}:{artifact_sha256[:16]}:{digest}'
+
+
+class PredictionCache:
+    def __init__(self, max_entries=10000, ttl_seconds=3600.0, db_path=None, db_max_entries=1000000):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.db_path = db_path
+        self.db_max_entries = db_max_entries
+        self._memory = OrderedDict()  # key -> (model, payload, expires_at)
+        self._artifacts = {}  # model -> artifact hash seen last
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+        self._db_writes = 0
+        if db_path:
+            self._init_db()
+
+    # -- SQLite tier -------------------------------------------------------
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().executescript('''
+            CREATE TABLE IF NOT EXISTS predictions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                artifact TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS predictions_model ON predictions (model, artifact);
+            CREATE INDEX IF NOT EXISTS predictions_expires ON predictions (expires_at);
+        ''')
+
+    def _db_get(self, key, now):
+        row = self._connect().execute(
+            'SELECT payload FROM predictions WHERE key = ? AND expires_at > ?', (key, now)).fetchone()
+        return row[0] if row else None
+
+    def _db_put(self, key, name, artifact, payload, expires_at):
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)',
+                     (key, name, artifact, payload, expires_at, len(key) + len(payload)))
+        # Amortised eviction: expired rows first, then the oldest beyond the cap
+        self._db_writes += 1
+        if self._db_writes % 256 == 0:
+            conn.execute('DELETE FROM predictions WHERE expires_at <= ?', (time.time(),))
+            conn.execute('''DELETE FROM predictions WHERE key IN (
+                                SELECT key FROM predictions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)''',
+                         (self.db_max_entries,))
+
+    # -- public API ----------------------------------------------------------
+
+    def _model_stats(self, name):
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+                                         'evictions': 0, 'invalidations': 0, 'memory_entries': 0,
+                                         'memory_bytes': 0}
+        return stats
+
+    def _check_artifact(self, name, artifact):
+        """Drop in-memory entries computed with an older artifact of ``name`` (call with the lock held)
+
+        Returns True when the SQLite tier needs the same purge; the caller runs
+        ``_purge_db`` after releasing the lock, so memory lookups in other
+        threads never wait on disk I/O.
+        """
+        previous = self._artifacts.get(name)
+        if previous == artifact:
+            return False
+        self._artifacts[name] = artifact
+        if previous is None:
+            return False
+        stats = self._model_stats(name)
+        for key in [k for k, (model, _, _) in self._memory.items() if model == name]:
+            _, payload, _ = self._memory.pop(key)
+            stats['memory_entries'] -= 1
+            stats['memory_bytes'] -= len(key) + len(payload)
+        stats['invalidations'] += 1
+        return bool(self.db_path)
+
+    def _purge_db(self, name, artifact):
+        self._connect().execute('DELETE FROM predictions WHERE model = ? AND artifact != ?', (name, artifact))
+
+    def get(self, name, row):
+        """Cached ``(label, value, kind)`` for ``row``, or ``None`` on a miss"""
+        artifact = registry.sha256(name)
+        key = canonical_key(name, artifact, row)
+        now = time.time()
+        with self._lock:
+            purge = self._check_artifact(name, artifact)
+            stats = self._model_stats(name)
+            entry = self._memory.get(key)
+            if entry is not None and entry[2] > now:
+                self._memory.move_to_end(key)
+                stats['hits'] += 1
+                stats['memory_hits'] += 1
+                return tuple(json.loads(entry[1]))
+        if purge:
+            self._purge_db(name, artifact)
+
+        payload = self._db_get(key, now) if self.db_path else None
+        with self._lock:
+            if payload is None:
+                stats['misses'] += 1
+                return None
+            stats['hits'] += 1
+            stats['disk_hits'] += 1
+        self._remember(name, key, payload, now + self.ttl)
+        return tuple(json.loads(payload))
+
+    def put(self, name, row, result):
+        artifact = registry.sha256(name)
+        key = canonical_key(name, artifact, row)
+        payload = json.dumps([result[0], result[1], result[2]])
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            purge = self._check_artifact(name, artifact)
+        if purge:
+            self._purge_db(name, artifact)
+        self._remember(name, key, payload, expires_at)
+        if self.db_path:
+            self._db_put(key, name, artifact, payload, expires_at)
+
+    def get_or_compute(self, name, row, compute):
+        """Return the cached result for ``row``, or store and return ``compute()``"""
+        result = self.get(name, row)
+        if result is None:
+            result = compute()
+            self.put(name, row, result)
+        return result
+
+    def _remember(self, name, key, payload, expires_at):
+        with self._lock:
+            stats = self._model_stats(name)
+            old = self._memory.pop(key, None)
+            if old is not None:
+                stats['memory_entries'] -= 1
+                stats['memory_bytes'] -= len(key) + len(old[1])
+            self._memory[key] = (name, payload, expires_at)
+            stats['memory_entries'] += 1
+            stats['memory_bytes'] += len(key) + len(payload)
+            while len(self._memory) > self.max_entries:
+                old_key, (old_name, old_payload, _) = self._memory.popitem(last=False)
+                evicted = self._model_stats(old_name)
+                evicted['memory_entries'] -= 1
+                evicted['memory_bytes'] -= len(old_key) + len(old_payload)
+                evicted['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for stats in self._stats.values():
+                stats['memory_entries'] = stats['memory_bytes'] = 0
+        if self.db_path:
+            self._connect().execute('DELETE FROM predictions')
+
+    def stats(self):
+        """Per-model hit ratio, tier hits, evictions and bytes used"""
+        with self._lock:
+            out = {name: dict(stats) for name, stats in self._stats.items()}
+        disk = {}
+        if self.db_path:
+            disk = {model: (count, size) for model, count, size in self._connect().execute(
+                'SELECT model, COUNT(*), SUM(size) FROM predictions GROUP BY model')}
+        for name, stats in out.items():
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+            if self.db_path:
+                stats['disk_entries'], stats['disk_bytes'] = disk.get(name, (0, 0))
+        return out
+
+
+# Shared by every Streamlit session and API request in this process
+cache = PredictionCache(
+    max_entries=config.PREDICTION_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.PREDICTION_CACHE_TTL_SECONDS,
+    db_path=config.PREDICTION_CACHE_DB or None,
+    db_max_entries=config.PREDICTION_CACHE_DB_MAX_ENTRIES,
+)
+
+
+def predict_row(name, row):
+    """Score one feature row through the cache, then the micro-batcher or the model"""
+    from batching import get_batcher
+    from drift import observe
+    from inference import score_row
+
+    observe(name, row)
+
+    def compute():
+        if config.MICRO_BATCHING:
+            return get_batcher(name).predict(row)
+        return score_row(name, row)
+
+    if config.PREDICTION_CACHE:
+        return cache.get_or_compute(name, row, compute)
+    return compute()
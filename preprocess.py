@@ -0,0 +1,232 @@
+"""Streaming preprocessing of raw clinical extracts into model-ready features.
+
+Upstream feeds for the thyroid and lung cancer models arrive in the layout of
+``Datasets/hypothyroid.csv`` and ``Datasets/survey_lung_cancer.csv``. This
+module applies the conversions from ``Thyroid.ipynb`` and ``Lung_Cancer.ipynb``
+and yields float64 matrices in the model's column order (see ``schemas.py``):
+
+* thyroid: ``t``/``f`` flags become 1/0, sex ``F``/``M`` becomes 1/0 and
+  ``'?'`` marks a missing value, which is filled with the column mean of the
+  training extract (the notebook imputed with means over the whole file);
+* lung cancer: ``GENDER`` ``M``/``F`` becomes 1/0 and ``LUNG_CANCER``
+  ``YES``/``NO`` becomes 1/0; the 1/2 symptom encodings are kept as they are.
+
+Files are read in chunks, and each chunk is converted with whole-column array
+operations, so memory use is bounded by the chunk size.
+
+    python preprocess.py check                        # parity with the preprocessed CSVs
+    python preprocess.py convert thyroid feed.csv -o features.csv
+"""
+import argparse
+import functools
+import os
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from model_registry import BASE_DIR
+from schemas import SCHEMAS
+
+DEFAULT_CHUNK_SIZE = 10000
+MISSING_MARKERS = ['?', '']
+
+
+@dataclass(frozen=True)
+class RawFormat:
+    model: str
+    # Raw training extract; the imputation means are fitted on it
+    source: str
+    target: str
+    target_codes: dict
+    # Column -> {raw value: encoded value}; other columns are parsed as numbers
+    codes: dict = field(default_factory=dict)
+    # Columns whose missing values are filled with the training mean
+    imputed: tuple = ()
+
+    def dtypes(self, columns):
+        return {c: str if c in self.codes or c == self.target else np.float64 for c in columns}
+
+
+_FLAG = {'t': 1.0, 'f': 0.0}
+
+RAW_FORMATS = {
+    'thyroid': RawFormat(
+        'thyroid', 'Datasets/hypothyroid.csv', 'binaryClass', {'P': 0, 'N': 1},
+        codes={'sex': {'F': 1.0, 'M': 0.0}, 'on thyroxine': _FLAG, 'T3 measured': _FLAG},
+        imputed=('age', 'sex', 'TSH', 'T3', 'TT4'),
+    ),
+    'lung_cancer': RawFormat(
+        'lung_cancer', 'Datasets/survey_lung_cancer.csv', 'LUNG_CANCER', {'NO': 0, 'YES': 1},
+        codes={'GENDER': {'F': 0.0, 'M': 1.0}},
+    ),
+}
+
+# Preprocessed extracts written by the notebooks, used for the parity check
+PREPROCESSED_FILES = {
+    'thyroid': 'Datasets/prepocessed_hypothyroid.csv',
+    'lung_cancer': 'Datasets/prepocessed_lungs_data.csv',
+}
+
+
+def _encode(values, mapping, column, offset):
+    """Map raw strings to codes; missing entries become NaN, unknown ones raise ``ValueError``"""
+    values = np.asarray(values, dtype=object)
+    out = np.full(len(values), np.nan)
+    known = pd.isna(values)
+    for raw, code in mapping.items():
+        hit = values == raw
+        out[hit] = code
+        known |= hit
+    if not known.all():
+        row = int(np.flatnonzero(~known)[0])
+        raise ValueError(f"Row {offset + row}: unexpected value {values[row]!r} in column '{column}'")
+    return out
+
+
+def _read(fmt, source, columns, chunk_size):
+    return pd.read_csv(source, usecols=columns, dtype=fmt.dtypes(columns), na_values=MISSING_MARKERS,
+                       keep_default_na=False, chunksize=chunk_size, encoding='utf-8-sig')
+
+
+def _raw_matrix(fmt, chunk, offset):
+    """Encoded feature matrix for a raw chunk, with missing values left as NaN"""
+    columns = SCHEMAS[fmt.model].columns
+    X = np.empty((len(chunk), len(columns)), dtype=np.float64)
+    for j, column in enumerate(columns):
+        if column in fmt.codes:
+            X[:, j] = _encode(chunk[column].to_numpy(), fmt.codes[column], column, offset)
+        else:
+            X[:, j] = chunk[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    return X
+
+
+@functools.lru_cache(maxsize=None)
+def training_means(model, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Column means of the raw training extract for the imputed columns (one streaming pass)"""
+    fmt = RAW_FORMATS[model]
+    columns = SCHEMAS[model].columns
+    totals = np.zeros(len(columns))
+    counts = np.zeros(len(columns))
+    offset = 0
+    for chunk in _read(fmt, os.path.join(BASE_DIR, fmt.source), columns, chunk_size):
+        X = _raw_matrix(fmt, chunk, offset)
+        present = ~np.isnan(X)
+        totals += np.where(present, X, 0.0).sum(axis=0)
+        counts += present.sum(axis=0)
+        offset += len(chunk)
+    return {c: totals[j] / counts[j] for j, c in enumerate(columns) if c in fmt.imputed}
+
+
+def transform(model, chunk, offset=0):
+    """``(X, y)`` for a raw chunk; ``y`` is ``None`` when the chunk has no target column"""
+    fmt = RAW_FORMATS[model]
+    X = _raw_matrix(fmt, chunk, offset)
+    missing = np.isnan(X)
+    if missing.any():
+        means = training_means(model)
+        for j, column in enumerate(SCHEMAS[model].columns):
+            if not missing[:, j].any():
+                continue
+            if column not in means:
+                row = int(np.flatnonzero(missing[:, j])[0])
+                raise ValueError(f"Row {offset + row}: missing value in column '{column}'")
+            X[missing[:, j], j] = means[column]
+    y = None
+    if fmt.target in chunk:
+        y = _encode(chunk[fmt.target].to_numpy(), fmt.target_codes, fmt.target, offset)
+        if np.isnan(y).any():
+            row = int(np.flatnonzero(np.isnan(y))[0])
+            raise ValueError(f"Row {offset + row}: missing value in column '{fmt.target}'")
+        y = y.astype(np.int64)
+    return X, y
+
+
+def iter_raw_chunks(model, source, chunk_size=DEFAULT_CHUNK_SIZE, id_column=None):
+    """Yield ``(row_offset, ids, X, y)`` for a raw extract, chunk by chunk"""
+    fmt = RAW_FORMATS[model]
+    header = pd.read_csv(source, nrows=0, encoding='utf-8-sig').columns
+    columns = SCHEMAS[model].columns + [c for c in (fmt.target, id_column) if c and c in header]
+    if id_column and id_column not in header:
+        raise ValueError(f"Column '{id_column}' not found in {source}")
+    offset = 0
+    for chunk in _read(fmt, source, columns, chunk_size):
+        X, y = transform(model, chunk, offset)
+        ids = chunk[id_column].to_numpy() if id_column else None
+        yield offset, ids, X, y
+        offset += len(chunk)
+
+
+def convert(model, source, output, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write the model-ready CSV for a raw extract; returns the row count"""
+    columns = SCHEMAS[model].columns
+    target = RAW_FORMATS[model].target
+    rows = 0
+    for offset, _, X, y in iter_raw_chunks(model, source, chunk_size):
+        frame = pd.DataFrame(X, columns=columns)
+        if y is not None:
+            frame[target] = y
+        frame.to_csv(output, header=(offset == 0), index=False)
+        rows += len(X)
+    return rows
+
+
+def check(model, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compare the streamed conversion of the raw training extract with its preprocessed CSV
+
+    Returns ``(rows, feature_mismatches, label_mismatches, max_abs_diff)``.
+    """
+    fmt = RAW_FORMATS[model]
+    columns = SCHEMAS[model].columns
+    expected = pd.read_csv(os.path.join(BASE_DIR, PREPROCESSED_FILES[model]), usecols=columns + [fmt.target],
+                           encoding='utf-8-sig')
+    X_expected = expected[columns].to_numpy(dtype=np.float64)
+    y_expected = expected[fmt.target].to_numpy(dtype=np.int64)
+    chunks = list(iter_raw_chunks(model, os.path.join(BASE_DIR, fmt.source), chunk_size))
+    X = np.vstack([c[2] for c in chunks])
+    y = np.concatenate([c[3] for c in chunks])
+    if X.shape != X_expected.shape:
+        raise ValueError(f'{model}: {len(X)} rows streamed, {len(X_expected)} in {PREPROCESSED_FILES[model]}')
+    close = np.isclose(X, X_expected, rtol=1e-9, atol=0.0)
+    return (len(X), int(np.count_nonzero(~close.all(axis=1))), int(np.count_nonzero(y != y_expected)),
+            float(np.abs(X - X_expected).max()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert raw thyroid / lung cancer extracts to model features.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    check_parser = sub.add_parser('check', help='compare with the preprocessed CSVs in Datasets/')
+    check_parser.add_argument('models', nargs='*', metavar='model',
+                              help=f"models to check (default: {', '.join(RAW_FORMATS)})")
+    convert_parser = sub.add_parser('convert', help='write the model-ready CSV for a raw extract')
+    convert_parser.add_argument('model', choices=sorted(RAW_FORMATS))
+    convert_parser.add_argument('input', help='raw CSV extract')
+    convert_parser.add_argument('-o', '--output', default='-', help="output CSV (default: '-' for stdout)")
+    for p in (check_parser, convert_parser):
+        p.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        if args.output == '-':
+            rows = convert(args.model, args.input, sys.stdout, args.chunk_size)
+        else:
+            with open(args.output, 'w', newline='') as f:
+                rows = convert(args.model, args.input, f, args.chunk_size)
+        print(f'Converted {rows} rows for {args.model}', file=sys.stderr)
+        return
+
+    unknown = sorted(set(args.models) - set(RAW_FORMATS))
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+    failed = False
+    for model in args.models or RAW_FORMATS:
+        rows, features, labels, max_diff = check(model, args.chunk_size)
+        failed |= bool(features or labels)
+        print(f'{model:12s} rows={rows} feature_mismatches={features} label_mismatches={labels} '
+              f'max_abs_diff={max_diff:.3g}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
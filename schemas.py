@@ -0,0 +1,182 @@
+"""Per-model feature schemas shared by the UI, batch and API entry points.
+
+Each ``ModelSchema`` lists the model's features in the column order the
+model expects. A feature carries its input name (the record key, also used to
+derive the Streamlit widget key), the column name in the ``Datasets/`` CSV,
+the form label and tooltip, UI bounds and dtype. All entry points build their
+float64 feature matrices and run validation through these schemas, so the
+column order is defined in exactly one place.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Feature:
+    name: str
+    label: str
+    help: str
+    min_value: float
+    max_value: float
+    dtype: str = 'int'
+    column: str = None
+
+    @property
+    def bounds(self):
+        """``(min, max)`` cast to the widget type, as ``display_input`` expects"""
+        cast = float if self.dtype == 'float' else int
+        return cast(self.min_value), cast(self.max_value)
+
+
+class ModelSchema:
+    def __init__(self, model, features):
+        self.model = model
+        self.features = tuple(features)
+        self.names = [f.name for f in self.features]
+        self.columns = [f.column or f.name for f in self.features]
+        self.lower = np.array([f.min_value for f in self.features], dtype=np.float64)
+        self.upper = np.array([f.max_value for f in self.features], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.features)
+
+    def __iter__(self):
+        return iter(self.features)
+
+    def widget_key(self, feature):
+        """Session-state key, namespaced per model so pages sharing a feature don't collide"""
+        return f'{self.model}_{feature.name}'
+
+    def empty(self, n_rows=1):
+        return np.empty((n_rows, len(self.features)), dtype=np.float64)
+
+    def matrix(self, records):
+        """Build a float64 matrix from ``{feature name: value}`` records"""
+        X = self.empty(len(records))
+        names = self.names
+        for i, record in enumerate(records):
+            try:
+                X[i] = [record[name] for name in names]
+            except KeyError:
+                missing = [name for name in names if name not in record]
+                raise ValueError(f"Record {i} is missing features for '{self.model}': {', '.join(missing)}") from None
+            except (TypeError, ValueError):
+                raise ValueError(f"Record {i} has non-numeric values for '{self.model}'") from None
+        return X
+
+    def out_of_range(self, X):
+        """Boolean mask of rows with a non-finite or out-of-bounds value"""
+        X = np.asarray(X, dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            bad = (X < self.lower) | (X > self.upper)
+        bad |= ~np.isfinite(X)
+        return bad.any(axis=1)
+
+    def validate(self, X):
+        """Raise ``ValueError`` naming the first offending row if any row is out of range"""
+        rows = np.flatnonzero(self.out_of_range(X))
+        if rows.size:
+            row = X[rows[0]]
+            bad = [f'{f.name}={row[j]:g} (expected {f.min_value:g}..{f.max_value:g})'
+                   for j, f in enumerate(self.features)
+                   if not np.isfinite(row[j]) or not f.min_value <= row[j] <= f.max_value]
+            raise ValueError(f"{rows.size} record(s) out of range for '{self.model}'; "
+                             f"record {rows[0]}: {', '.join(bad)}")
+        return X
+
+
+SCHEMAS = {schema.model: schema for schema in [
+    ModelSchema('diabetes', [
+        Feature('Pregnancies', 'Number of Pregnancies', 'Enter number of times pregnant', 0, 20),
+        Feature('Glucose', 'Glucose Level (mg/dL)', 'Enter glucose level (normal range: 70-99 mg/dL)', 0, 300),
+        Feature('BloodPressure', 'Blood Pressure (mmHg)', 'Enter blood pressure value (normal: <120/80 mmHg)', 0, 200),
+        Feature('SkinThickness', 'Skin Thickness (mm)', 'Enter skin thickness value', 0, 100),
+        Feature('Insulin', 'Insulin Level (μU/mL)', 'Enter insulin level (normal: 2-25 μU/mL)', 0, 1000),
+        Feature('BMI', 'BMI Value', 'Enter Body Mass Index value (normal: 18.5-24.9)', 10, 60, 'float'),
+        Feature('DiabetesPedigreeFunction', 'Diabetes Pedigree Function', 'Enter diabetes pedigree function value',
+                0.0, 2.5, 'float'),
+        Feature('Age', 'Age', 'Enter age of the person', 0, 120),
+    ]),
+    ModelSchema('heart_disease', [
+        Feature('age', 'Age', 'Enter age of the person', 0, 120),
+        Feature('sex', 'Sex (1 = male; 0 = female)', 'Enter sex of the person', 0, 1),
+        Feature('cp', 'Chest Pain types (0-3)',
+                '0: Typical angina, 1: Atypical angina, 2: Non-anginal pain, 3: Asymptomatic', 0, 3),
+        Feature('trestbps', 'Resting Blood Pressure (mmHg)', 'Enter resting blood pressure (normal: <120 mmHg)', 50, 250),
+        Feature('chol', 'Serum Cholesterol (mg/dL)', 'Enter serum cholesterol (desirable: <200 mg/dL)', 100, 600),
+        Feature('fbs', 'Fasting Blood Sugar > 120 mg/dl', '1 = true; 0 = false', 0, 1),
+        Feature('restecg', 'Resting ECG results (0-2)',
+                '0: Normal, 1: ST-T wave abnormality, 2: Probable or definite left ventricular hypertrophy', 0, 2),
+        Feature('thalach', 'Maximum Heart Rate', 'Enter maximum heart rate achieved', 60, 220),
+        Feature('exang', 'Exercise Induced Angina', '1 = yes; 0 = no', 0, 1),
+        Feature('oldpeak', 'ST Depression', 'ST depression induced by exercise relative to rest', 0.0, 6.2, 'float'),
+        Feature('slope', 'Slope of Peak Exercise ST', '0: Upsloping, 1: Flat, 2: Downsloping', 0, 2),
+        Feature('ca', 'Major Vessels (0-4)', 'Number of major vessels colored by fluoroscopy', 0, 4),
+        Feature('thal', 'Thalassemia', '1 = normal; 2 = fixed defect; 3 = reversible defect', 0, 3),
+    ]),
+    ModelSchema('parkinsons', [
+        Feature('fo', 'MDVP:Fo(Hz)', 'Average vocal fundamental frequency', 80, 270, 'float', 'MDVP:Fo(Hz)'),
+        Feature('fhi', 'MDVP:Fhi(Hz)', 'Maximum vocal fundamental frequency', 100, 600, 'float', 'MDVP:Fhi(Hz)'),
+        Feature('flo', 'MDVP:Flo(Hz)', 'Minimum vocal fundamental frequency', 60, 250, 'float', 'MDVP:Flo(Hz)'),
+        Feature('Jitter_percent', 'MDVP:Jitter(%)', 'Measure of frequency variation', 0.0, 0.1, 'float',
+                'MDVP:Jitter(%)'),
+        Feature('Jitter_Abs', 'MDVP:Jitter(Abs)', 'Absolute jitter measure', 0.0, 0.0005, 'float', 'MDVP:Jitter(Abs)'),
+        Feature('RAP', 'MDVP:RAP', 'Relative amplitude perturbation', 0.0, 0.1, 'float', 'MDVP:RAP'),
+        Feature('PPQ', 'MDVP:PPQ', 'Five-point period perturbation quotient', 0.0, 0.1, 'float', 'MDVP:PPQ'),
+        Feature('DDP', 'Jitter:DDP', 'Average absolute difference of differences between cycles', 0.0, 0.1, 'float',
+                'Jitter:DDP'),
+        Feature('Shimmer', 'MDVP:Shimmer', 'Measure of amplitude variation', 0.0, 0.2, 'float', 'MDVP:Shimmer'),
+        Feature('Shimmer_dB', 'MDVP:Shimmer(dB)', 'Shimmer in decibels', 0.0, 1.5, 'float', 'MDVP:Shimmer(dB)'),
+        Feature('APQ3', 'Shimmer:APQ3', 'Three-point amplitude perturbation quotient', 0.0, 0.2, 'float',
+                'Shimmer:APQ3'),
+        Feature('APQ5', 'Shimmer:APQ5', 'Five-point amplitude perturbation quotient', 0.0, 0.2, 'float',
+                'Shimmer:APQ5'),
+        Feature('APQ', 'MDVP:APQ', 'Amplitude perturbation quotient', 0.0, 0.2, 'float', 'MDVP:APQ'),
+        Feature('DDA', 'Shimmer:DDA', 'Average absolute difference between consecutive differences', 0.0, 0.2,
+                'float', 'Shimmer:DDA'),
+        Feature('NHR', 'NHR', 'Noise-to-harmonics ratio', 0.0, 0.5, 'float'),
+        Feature('HNR', 'HNR', 'Harmonics-to-noise ratio', 0, 40, 'float'),
+        Feature('RPDE', 'RPDE', 'Nonlinear dynamical complexity measure', 0.0, 1.0, 'float'),
+        Feature('DFA', 'DFA', 'Signal fractal scaling exponent', 0.4, 0.9, 'float'),
+        Feature('spread1', 'Spread1', 'Nonlinear measure of fundamental frequency variation', -10.0, 0.0, 'float'),
+        Feature('spread2', 'Spread2', 'Nonlinear measure of fundamental frequency variation', 0.0, 0.5, 'float'),
+        Feature('D2', 'D2', 'Correlation dimension', 1.0, 4.0, 'float'),
+        Feature('PPE', 'PPE', 'Pitch period entropy', 0.0, 0.6, 'float'),
+    ]),
+    ModelSchema('lung_cancer', [
+        Feature('GENDER', 'Gender (1 = Male; 0 = Female)', 'Enter gender of the person', 0, 1),
+        Feature('AGE', 'Age', 'Enter age of the person', 0, 120),
+        Feature('SMOKING', 'Smoking (2 = Yes; 1 = No)', 'Enter if the person smokes', 1, 2),
+        Feature('YELLOW_FINGERS', 'Yellow Fingers (2 = Yes; 1 = No)', 'Enter if the person has yellow fingers', 1, 2),
+        Feature('ANXIETY', 'Anxiety (2 = Yes; 1 = No)', 'Enter if the person has anxiety', 1, 2),
+        Feature('PEER_PRESSURE', 'Peer Pressure (2 = Yes; 1 = No)', 'Enter if the person is under peer pressure', 1, 2),
+        Feature('CHRONIC_DISEASE', 'Chronic Disease (2 = Yes; 1 = No)', 'Enter if the person has a chronic disease',
+                1, 2, column='CHRONIC DISEASE'),
+        Feature('FATIGUE', 'Fatigue (2 = Yes; 1 = No)', 'Enter if the person experiences fatigue', 1, 2,
+                column='FATIGUE '),
+        Feature('ALLERGY', 'Allergy (2 = Yes; 1 = No)', 'Enter if the person has allergies', 1, 2, column='ALLERGY '),
+        Feature('WHEEZING', 'Wheezing (2 = Yes; 1 = No)', 'Enter if the person experiences wheezing', 1, 2),
+        Feature('ALCOHOL_CONSUMING', 'Alcohol Consuming (2 = Yes; 1 = No)', 'Enter if the person consumes alcohol',
+                1, 2, column='ALCOHOL CONSUMING'),
+        Feature('COUGHING', 'Coughing (2 = Yes; 1 = No)', 'Enter if the person experiences coughing', 1, 2),
+        Feature('SHORTNESS_OF_BREATH', 'Shortness Of Breath (2 = Yes; 1 = No)',
+                'Enter if the person experiences shortness of breath', 1, 2, column='SHORTNESS OF BREATH'),
+        Feature('SWALLOWING_DIFFICULTY', 'Swallowing Difficulty (2 = Yes; 1 = No)',
+                'Enter if the person has difficulty swallowing', 1, 2, column='SWALLOWING DIFFICULTY'),
+        Feature('CHEST_PAIN', 'Chest Pain (2 = Yes; 1 = No)', 'Enter if the person experiences chest pain', 1, 2,
+                column='CHEST PAIN'),
+    ]),
+    ModelSchema('thyroid', [
+        Feature('age', 'Age', 'Enter age of the person', 0, 120),
+        Feature('sex', 'Sex (1 = Female; 0 = Male)', 'Enter sex of the person', 0, 1),
+        Feature('on_thyroxine', 'On Thyroxine (1 = Yes; 0 = No)', 'Enter if the person is on thyroxine medication',
+                0, 1, column='on thyroxine'),
+        Feature('tsh', 'TSH Level (mIU/L)', 'Thyroid Stimulating Hormone level (normal: 0.4-4.0 mIU/L)', 0.0, 600.0,
+                'float', 'TSH'),
+        Feature('t3_measured', 'T3 Measured (1 = Yes; 0 = No)', 'Enter if T3 was measured', 0, 1,
+                column='T3 measured'),
+        Feature('t3', 'T3 Level (nmol/L)', 'Triiodothyronine level (normal: 1.2-3.1 nmol/L)', 0.0, 15.0, 'float', 'T3'),
+        Feature('tt4', 'TT4 Level (nmol/L)', 'Total Thyroxine level (normal: 58-160 nmol/L)', 0.0, 500.0, 'float', 'TT4'),
+    ]),
+]}
@@ -0,0 +1,259 @@
+"""Reproducible training pipeline for the five disease models.
+
+Rebuilds ``Models/*.sav`` (and their pickle-free artifacts) from the CSVs in
+``Datasets/`` with the recipes from the notebooks: the same column order,
+hold-out split, seeds and estimator settings. Work runs on a process pool in
+three stages: preprocessing one task per model, cross-validation one task
+per (model, parameter set, fold), and the final fit one task per model.
+
+Preprocessed frames are cached under ``.cache/training/``, keyed by the
+dataset's SHA-256 and ``PREPROCESS_VERSION``, so an unchanged dataset is
+not parsed again.
+
+    python train.py                          # retrain all five into Models/
+    python train.py thyroid --search         # pick C by cross-validation
+    python train.py --output-dir /tmp/models --report report.json
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from batch_predict import DATASET_FILES
+from model_registry import BASE_DIR, MODEL_FILES, ModelRegistry, file_sha256
+from schemas import SCHEMAS
+
+# Bump when the preprocessing below changes, so cached frames are rebuilt
+PREPROCESS_VERSION = 1
+CACHE_DIR = os.path.join(BASE_DIR, '.cache', 'training')
+CV_FOLDS = 5
+CV_SEED = 42
+
+
+@dataclass(frozen=True)
+class TrainingSpec:
+    target: str
+    estimator: str
+    params: dict = field(default_factory=dict)
+    grid: tuple = ()
+    test_size: float = 0.2
+    stratify: bool = True
+    random_state: int = 2
+    # Lung_Cancer.ipynb fits on ``.values``, so that model has no feature names
+    feature_names: bool = True
+
+
+# Hold-out split and estimator settings from the notebooks. The first entry
+# of ``grid`` is always the notebook's own setting; the linear SVCs are fitted
+# on unscaled features, where libsvm slows down sharply as C grows, so their
+# grids only search downwards.
+TRAINING_SPECS = {
+    'diabetes': TrainingSpec('Outcome', 'svc', {'kernel': 'linear'}, grid=({'C': 1.0}, {'C': 0.1}, {'C': 0.01})),
+    'heart_disease': TrainingSpec('target', 'logistic_regression', grid=({'C': 1.0}, {'C': 0.1}, {'C': 10.0})),
+    'parkinsons': TrainingSpec('status', 'svc', {'kernel': 'linear'}, grid=({'C': 1.0}, {'C': 0.1}, {'C': 0.01}),
+                               stratify=False),
+    'lung_cancer': TrainingSpec('LUNG_CANCER', 'logistic_regression', grid=({'C': 1.0}, {'C': 0.1}, {'C': 10.0}),
+                                feature_names=False),
+    'thyroid': TrainingSpec('binaryClass', 'logistic_regression', grid=({'C': 1.0}, {'C': 0.1}, {'C': 10.0}),
+                            stratify=False, random_state=42),
+}
+
+
+def make_estimator(kind, params):
+    if kind == 'svc':
+        from sklearn.svm import SVC
+        return SVC(**params)
+    if kind == 'logistic_regression':
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(**params)
+    raise ValueError(f'Unknown estimator {kind!r}')
+
+
+def _init_worker():
+    # One BLAS/OpenMP thread per process; the pool provides the parallelism
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+    warnings.filterwarnings('ignore', category=UserWarning)
+
+
+# -- preprocessing -----------------------------------------------------------
+
+def preprocess(name, source):
+    """``(X, y)`` for ``name`` from its dataset CSV, in schema column order"""
+    spec = TRAINING_SPECS[name]
+    columns = SCHEMAS[name].columns
+    frame = pd.read_csv(source, usecols=columns + [spec.target], encoding='utf-8-sig')
+    X = frame[columns].apply(pd.to_numeric, errors='raise').to_numpy(dtype=np.float64)
+    y = frame[spec.target].to_numpy(dtype=np.int64)
+    return X, y
+
+
+def cache_path(name, dataset_sha256, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f'{name}-{dataset_sha256[:16]}-v{PREPROCESS_VERSION}.npz')
+
+
+def load_frame(name, cache_dir=CACHE_DIR, use_cache=True):
+    """Preprocessed ``(X, y, dataset_sha256, cached)``, reusing the cache when the dataset is unchanged"""
+    source = os.path.join(BASE_DIR, DATASET_FILES[name])
+    sha256 = file_sha256(source)
+    path = cache_path(name, sha256, cache_dir)
+    if use_cache and os.path.exists(path):
+        with np.load(path, allow_pickle=False) as data:
+            return data['X'], data['y'], sha256, True
+    X, y = preprocess(name, source)
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp, X=X, y=y)
+        os.replace(tmp, path)
+    return X, y, sha256, False
+
+
+# -- pool tasks ----------------------------------------------------------------
+
+def _frame(name, X, spec):
+    return pd.DataFrame(X, columns=SCHEMAS[name].columns) if spec.feature_names else X
+
+
+def split(name, X, y):
+    """Notebook hold-out split: ``(train_index, test_index)``"""
+    from sklearn.model_selection import train_test_split
+
+    spec = TRAINING_SPECS[name]
+    index = np.arange(len(y))
+    return train_test_split(index, test_size=spec.test_size, stratify=y if spec.stratify else None,
+                            random_state=spec.random_state)
+
+
+def cv_fold(name, params, fold, X, y, train_index):
+    """Validation accuracy of ``params`` on one stratified fold of the training split"""
+    from sklearn.model_selection import StratifiedKFold
+
+    spec = TRAINING_SPECS[name]
+    folds = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=CV_SEED)
+    fit_rows, val_rows = list(folds.split(train_index, y[train_index]))[fold]
+    fit_rows, val_rows = train_index[fit_rows], train_index[val_rows]
+    model = make_estimator(spec.estimator, {**spec.params, **params})
+    model.fit(_frame(name, X[fit_rows], spec), y[fit_rows])
+    return float(np.mean(model.predict(_frame(name, X[val_rows], spec)) == y[val_rows]))
+
+
+def fit_final(name, params, X, y, train_index, test_index):
+    """Fit on the hold-out training split; returns the estimator and its accuracies"""
+    spec = TRAINING_SPECS[name]
+    model = make_estimator(spec.estimator, {**spec.params, **params})
+    start = time.perf_counter()
+    model.fit(_frame(name, X[train_index], spec), y[train_index])
+    fit_seconds = time.perf_counter() - start
+    accuracy = {
+        'train': float(np.mean(model.predict(_frame(name, X[train_index], spec)) == y[train_index])),
+        'test': float(np.mean(model.predict(_frame(name, X[test_index], spec)) == y[test_index])),
+    }
+    return model, accuracy, fit_seconds
+
+
+# -- driver --------------------------------------------------------------------
+
+def train(models=None, search=False, output_dir=None, workers=None, cache_dir=CACHE_DIR, use_cache=True,
+          convert=True):
+    """Retrain ``models`` (default: all) in parallel and write them out; returns a report per model"""
+    from sklearn import __version__ as sklearn_version
+
+    models = list(models or TRAINING_SPECS)
+    output_dir = output_dir or os.path.join(BASE_DIR, 'Models')
+    report = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        frames = dict(zip(models, pool.map(load_frame, models, [cache_dir] * len(models),
+                                           [use_cache] * len(models))))
+        splits = {name: split(name, frames[name][0], frames[name][1]) for name in models}
+
+        grids = {name: (TRAINING_SPECS[name].grid if search else TRAINING_SPECS[name].grid[:1]) or ({},)
+                 for name in models}
+        cv = {}
+        for name in models:
+            X, y = frames[name][:2]
+            train_index = splits[name][0]
+            for i, params in enumerate(grids[name]):
+                for fold in range(CV_FOLDS):
+                    cv[name, i, fold] = pool.submit(cv_fold, name, params, fold, X, y, train_index)
+
+        chosen = {}
+        for name in models:
+            scores = [[cv[name, i, fold].result() for fold in range(CV_FOLDS)] for i in range(len(grids[name]))]
+            means = [float(np.mean(s)) for s in scores]
+            best = int(np.argmax(means))  # ties keep the earlier (notebook) setting
+            chosen[name] = grids[name][best]
+            report[name] = {
+                'cv': [{'params': p, 'mean_accuracy': m, 'fold_accuracy': s}
+                       for p, m, s in zip(grids[name], means, scores)],
+                'params': {**TRAINING_SPECS[name].params, **chosen[name]},
+            }
+
+        fits = {name: pool.submit(fit_final, name, chosen[name], frames[name][0], frames[name][1], *splits[name])
+                for name in models}
+        estimators = {}
+        for name in models:
+            estimators[name], accuracy, fit_seconds = fits[name].result()
+            X, y, sha256, cached = frames[name]
+            report[name].update(accuracy=accuracy, fit_seconds=fit_seconds, rows=int(len(y)),
+                                dataset={'path': DATASET_FILES[name], 'sha256': sha256, 'cached': cached},
+                                sklearn_version=sklearn_version)
+
+    registry = ModelRegistry({name: os.path.join(output_dir, os.path.basename(MODEL_FILES[name]))
+                              for name in MODEL_FILES})
+    for name in models:
+        path = registry.sav_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(estimators[name], f)
+        os.replace(tmp, path)
+        report[name]['output'] = path
+        if convert:
+            from artifacts import convert as convert_artifact
+            report[name]['artifact'] = convert_artifact(name, registry)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Retrain the disease models from Datasets/.')
+    parser.add_argument('models', nargs='*', metavar='model',
+                        help=f"models to train (default: all of {', '.join(TRAINING_SPECS)})")
+    parser.add_argument('--search', action='store_true',
+                        help='choose hyperparameters from each grid by cross-validation (default: notebook settings)')
+    parser.add_argument('--output-dir', help='directory for the .sav files and artifacts (default: Models/)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per core)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='cache of preprocessed frames')
+    parser.add_argument('--no-cache', action='store_true', help='always re-read the datasets')
+    parser.add_argument('--no-convert', action='store_true', help='skip writing the pickle-free artifacts')
+    parser.add_argument('--report', help='write the training report as JSON here')
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.models) - set(TRAINING_SPECS))
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+
+    warnings.filterwarnings('ignore', category=UserWarning)
+    start = time.perf_counter()
+    report = train(args.models, search=args.search, output_dir=args.output_dir, workers=args.workers,
+                   cache_dir=args.cache_dir, use_cache=not args.no_cache, convert=not args.no_convert)
+    for name, entry in report.items():
+        cv = max(entry['cv'], key=lambda c: c['mean_accuracy'])['mean_accuracy']
+        print(f"{name:14s} params={entry['params']} cv={cv:.3f} train={entry['accuracy']['train']:.3f} "
+              f"test={entry['accuracy']['test']:.3f} cached={entry['dataset']['cached']}", file=sys.stderr)
+    print(f'trained {len(report)} model(s) in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()